@@ -1,12 +1,38 @@
-from fastapi import APIRouter, HTTPException # type: ignore
-from datetime import datetime
-import statistics
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
 
-from models.schemas import VideoAnalysisRequest, AnalysisResponse, CommentAnalysisDetail
+from pydantic import ValidationError
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request # type: ignore
+from fastapi.encoders import jsonable_encoder # type: ignore
+from fastapi.exceptions import RequestValidationError # type: ignore
+from fastapi.responses import JSONResponse, Response, StreamingResponse # type: ignore
+
+from models.schemas import (
+    AnalysisOptions, VideoAnalysisRequest, ChannelAnalysisRequest, AnalysisResponse,
+    SimilarVideosResponse, CommentSearchResponse, Watchlist, VideoTrendResponse, ChannelTrendResponse
+)
 from services.youtube_service import YouTubeService
 from services.gemini_service import GeminiService
 from services.sentiment_service import SentimentService
-from services.utils import extract_video_id
+from services.analysis_cache import AnalysisCache
+from services.analysis_planner import AnalysisPlan, build_plan, project_response
+from services.analysis_pipeline import AnalysisPipeline
+from services.channel_service import ChannelAnalyzer
+from services.prefetch_service import PrefetchScheduler
+from services.export_service import EXPORT_FORMATS, ExportService, parquet_available
+from services.similarity_index import similarity_index
+from services.comment_index import comment_index
+from services.history_store import history_store
+from services.utils import extract_video_id, parse_channel_ref
+from core.admission import AdmissionController, Overloaded
+from core.config import settings
+from core.deadline import Deadline
 from core.logger import logger
 
 router = APIRouter()
@@ -15,79 +41,278 @@ router = APIRouter()
 youtube_service = YouTubeService()
 gemini_service = GeminiService()
 sentiment_service = SentimentService()
+analysis_cache = AnalysisCache()
+analysis_pipeline = AnalysisPipeline(
+    youtube_service, gemini_service, sentiment_service, similarity_index, comment_index, history_store
+)
+analysis_admission = AdmissionController(
+    "analysis",
+    max_inflight=settings.admission_max_inflight,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout
+)
+export_service = ExportService(youtube_service, comment_index)
+channel_analyzer = ChannelAnalyzer(youtube_service, lambda video_id, plan: cached_analysis(video_id, plan))
 
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_video(request: VideoAnalysisRequest):
     """Analyze a YouTube video"""
-    start_time = datetime.now()
-    
     try:
         # Extract video ID
         video_id = extract_video_id(request.video_url)
         
-        # Fetch video information
-        video_info = await youtube_service.get_video_info_enhanced(video_id)
-        
-        # Fetch comments
-        comments = await youtube_service.get_video_comments(video_id, max_results=100)
-        
-        # Get transcript
-        transcript = await youtube_service.get_video_transcript(video_id)
-        
-        # Generate summary
-        summary = await gemini_service.generate_summary(transcript, video_info.description)
-        
-        # Extract topics
-        topics = await gemini_service.extract_topics(transcript, video_info.description)
-        
-        # Comprehensive comment analysis
-        comment_analysis_data = await sentiment_service.analyze_comments_comprehensive(comments)
-        
-        # Calculate sentiment distribution
-        sentiment_distribution = sentiment_service.calculate_sentiment_distribution(comments)
-        
-        # Generate sentiment over time
-        sentiment_over_time = sentiment_service.generate_sentiment_over_time(comments)
-        
-        # Comprehensive transcript analysis
-        engagement_rate = youtube_service.calculate_engagement_rate(comments, video_info.views)
-        video_analysis = await sentiment_service.analyze_transcript_comprehensive(
-            transcript, summary, len(comments), engagement_rate
-        )
-        
-        # Prepare detailed comment analysis
-        sentiment_scores = [comment.sentiment_score for comment in comments if comment.sentiment_score != 0]
-        avg_sentiment = statistics.mean(sentiment_scores) if sentiment_scores else 0.0
-        
-        comment_analysis = CommentAnalysisDetail(
-            total_comments=len(comments),
-            avg_sentiment=round(avg_sentiment, 2),
-            engagement_rate=round(engagement_rate, 2),
-            top_keywords=comment_analysis_data["top_keywords"],
-            sentiment_distribution_detailed=comment_analysis_data["sentiment_distribution_detailed"],
-            emotion_distribution=comment_analysis_data["emotion_distribution"],
-            quality_score=video_analysis.content_quality_score
-        )
-        
-        # Get top comments
-        top_comments = sorted(comments, key=lambda x: x.likes, reverse=True)[:5]
+        # Only the stages the caller asked for are run
+        plan = build_plan(request)
         
-        processing_time = (datetime.now() - start_time).total_seconds()
+        response = await cached_analysis(video_id, plan)
+        if request.fields is not None:
+            # Partial responses skip response_model validation and serialization
+            return JSONResponse(jsonable_encoder(project_response(response, request.fields)))
+        return response
         
-        return AnalysisResponse(
-            video_info=video_info,
-            summary=summary,
-            topics=topics,
-            sentiment_distribution=sentiment_distribution,
-            comment_analysis=comment_analysis,
-            sentiment_over_time=sentiment_over_time,
-            top_comments=top_comments,
-            video_analysis_detail=video_analysis,
-            processing_time=round(processing_time, 2)
+    except (HTTPException, Overloaded):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Analysis error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error during analysis")
+
+def _query_options(request: Request) -> AnalysisOptions:
+    """Analysis options from query parameters, defaulting like the POST body"""
+    try:
+        return AnalysisOptions.model_validate(dict(request.query_params))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+@router.get("/analysis/{video_id}", response_model=AnalysisResponse)
+async def get_analysis(video_id: str, request: Request, options: AnalysisOptions = Depends(_query_options)):
+    """Cacheable analysis of a video, answering conditional requests without recomputation"""
+    try:
+        plan = build_plan(options)
+        entry = await analysis_cache.get_or_compute_entry(
+            plan.cache_key(video_id), lambda: run_analysis(video_id, plan), ttl_for=_analysis_ttl
         )
-        
+    except (HTTPException, Overloaded):
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Analysis error: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error during analysis")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error during analysis")
+    
+    etag = entry["etag"]
+    if options.fields is not None:
+        # Each projection of the stored analysis is its own representation
+        etag = hashlib.sha256(f"{etag}:{','.join(sorted(options.fields))}".encode()).hexdigest()[:32]
+    headers = {
+        # Weak, since gzip and identity encodings of the analysis share it
+        "ETag": f'W/"{etag}"',
+        "Last-Modified": formatdate(entry["stored_at"], usegmt=True),
+        "Cache-Control": (
+            f"public, max-age={max(0, int(entry['fresh_until'] - time.time()))}, "
+            f"stale-while-revalidate={analysis_cache.stale_ttl}"
+        )
+    }
+    if _not_modified(request, etag, entry["stored_at"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(jsonable_encoder(project_response(entry["value"], options.fields)), headers=headers)
+
+def _not_modified(request: Request, etag: str, stored_at: float) -> bool:
+    """Evaluate If-None-Match, or failing that If-Modified-Since, against a stored analysis"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            # HTTP dates have whole-second precision
+            return int(stored_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+@router.post("/analyze/channel")
+async def analyze_channel(request: ChannelAnalysisRequest):
+    """Analyze a channel's recent uploads, streaming aggregates as NDJSON"""
+    try:
+        if request.fields is not None:
+            # Events carry channel aggregates, not per-video responses to project
+            raise HTTPException(status_code=400, detail="fields is not supported for channel analysis")
+        kind, value = parse_channel_ref(request.channel_url)
+        plan = build_plan(request)
+        channel, videos = await channel_analyzer.resolve(kind, value, request.max_videos)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Channel analysis error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error during channel analysis")
+    
+    if not videos:
+        raise HTTPException(status_code=404, detail="Channel has no public uploads")
+    
+    async def events():
+        async for event in channel_analyzer.run(channel, videos, plan):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.get("/similar/{video_id}", response_model=SimilarVideosResponse)
+async def similar_videos(video_id: str, limit: int = Query(10, ge=1, le=100)):
+    """Previously analyzed videos most similar to this one by topics, keywords and transcript"""
+    # The index syncs from SQLite, so it is queried off the event loop
+    if not await asyncio.to_thread(similarity_index.__contains__, video_id):
+        raise HTTPException(status_code=404, detail="Video has not been analyzed yet")
+    similar = await asyncio.to_thread(similarity_index.similar, video_id, limit)
+    return SimilarVideosResponse(video_id=video_id, similar=similar)
+
+@router.get("/search/comments", response_model=CommentSearchResponse)
+async def search_comments(
+    q: str = "",
+    video_id: Optional[str] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(positive|negative|neutral)$"),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    min_likes: Optional[int] = Query(None, ge=0),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    sort: str = Query("relevance", pattern="^(relevance|likes|recent)$"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    """Search indexed comments of all analyzed videos, or of one video"""
+    results = await asyncio.to_thread(
+        comment_index.search, q, video_id, sentiment, min_score, max_score,
+        min_likes, since, until, sort, limit, offset
+    )
+    return CommentSearchResponse(query=q, results=results)
+
+@router.get("/trends/video/{video_id}", response_model=VideoTrendResponse)
+async def video_trend(
+    video_id: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=10000)
+):
+    """Snapshots of a video's counts and sentiment from past analyses, oldest first"""
+    since_ts, until_ts = _time_range(since, until)
+    snapshots = await asyncio.to_thread(history_store.video_trend, video_id, since_ts, until_ts, limit)
+    title = await asyncio.to_thread(history_store.video_title, video_id)
+    if title is None:
+        raise HTTPException(status_code=404, detail="Video has not been analyzed yet")
+    return VideoTrendResponse(video_id=video_id, title=title, snapshots=snapshots)
+
+@router.get("/trends/channel/{channel_id}", response_model=ChannelTrendResponse)
+async def channel_trend(
+    channel_id: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    interval: str = Query("day", pattern="^(hour|day|week|month)$")
+):
+    """Totals over a channel's analyzed videos per time interval"""
+    since_ts, until_ts = _time_range(since, until)
+    points = await asyncio.to_thread(history_store.channel_trend, channel_id, since_ts, until_ts, interval)
+    return ChannelTrendResponse(channel_id=channel_id, interval=interval, points=points)
+
+def _time_range(since: Optional[str], until: Optional[str]):
+    """Parse ISO 8601 bounds (UTC unless they say otherwise) into timestamps"""
+    bounds = []
+    for value in (since, until):
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid time: {e}")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        bounds.append(parsed.timestamp())
+    return bounds
+
+@router.get("/export")
+async def export_comments(
+    video_url: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|parquet)$"),
+    max_comments: int = Query(None, ge=1),
+    include_replies: bool = False
+):
+    """Stream every comment of a video with its scores, plus per-video aggregates"""
+    try:
+        video_id = extract_video_id(video_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed")
+    
+    video_info = await youtube_service.get_video_info_enhanced(video_id)
+    media_type, extension = EXPORT_FORMATS[export_format]
+    chunks = export_service.export(
+        video_id, video_info, export_format, max_comments or settings.export_max_comments, include_replies
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{video_id}_comments.{extension}"'}
+    )
+
+async def cached_analysis(video_id: str, plan: AnalysisPlan) -> dict:
+    """Analysis for a video and plan, served from the shared cache.
+
+    Concurrent requests for the same video and plan, in this or another
+    worker, share a single computation.
+    """
+    return await analysis_cache.get_or_compute(
+        plan.cache_key(video_id), lambda: run_analysis(video_id, plan), ttl_for=_analysis_ttl
+    )
+
+def _analysis_ttl(response: dict):
+    """Keep degraded results only briefly so a full analysis replaces them soon"""
+    return settings.degraded_cache_ttl if response.get("degraded_stages") else None
+
+async def run_analysis(video_id: str, plan: AnalysisPlan) -> dict:
+    """Run the analysis pipeline for a video and return the serialized response.
+
+    Only computations take an admission slot; cache hits never wait. The
+    deadline starts before queuing, so time spent waiting for a slot comes
+    out of the request's budget.
+    """
+    deadline = Deadline(plan.deadline_seconds)
+    async with analysis_admission.admit(timeout=deadline.remaining()):
+        response = await analysis_pipeline.run(video_id, plan, deadline)
+    return response.model_dump()
+
+@router.get("/watchlist", response_model=Watchlist)
+async def get_watchlist():
+    """Videos and channels kept warm by the background prefetcher"""
+    return await asyncio.to_thread(prefetch_scheduler.watchlist)
+
+@router.post("/watchlist", response_model=Watchlist)
+async def add_to_watchlist(watchlist: Watchlist):
+    """Add videos and channels to the prefetch watchlist"""
+    return await asyncio.to_thread(prefetch_scheduler.update_watchlist, *_validated_watchlist(watchlist))
+
+@router.post("/watchlist/remove", response_model=Watchlist)
+async def remove_from_watchlist(watchlist: Watchlist):
+    """Remove videos and channels from the prefetch watchlist"""
+    return await asyncio.to_thread(
+        prefetch_scheduler.update_watchlist, *_validated_watchlist(watchlist), remove=True
+    )
+
+def _validated_watchlist(watchlist: Watchlist):
+    try:
+        videos = [extract_video_id(video) for video in watchlist.videos]
+        for channel in watchlist.channels:
+            parse_channel_ref(channel)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return videos, [channel.strip() for channel in watchlist.channels]
+
+# Prefetches with the default plan, so default /analyze requests hit its results
+prefetch_scheduler = PrefetchScheduler(
+    youtube_service, gemini_service, analysis_cache,
+    build_plan(AnalysisOptions()), run_analysis, ttl_for=_analysis_ttl
+)
@@ -0,0 +1,172 @@
+"""Microbenchmarks for the NLP hot paths, with a regression gate.
+
+Runs each benchmark on synthetic comment corpora and records throughput
+(comments per second, best of --repeat runs) and peak traced memory.
+Results are compared against a baseline JSON file. The script exits
+non-zero if any benchmark is slower, or uses more memory, than the
+baseline by more than --tolerance.
+
+Run from the backend directory:
+
+    python -m benchmarks.nlp_bench                      # compare against the baseline
+    python -m benchmarks.nlp_bench --update-baseline    # record a new baseline
+    python -m benchmarks.nlp_bench --sizes 1000 10000 --tolerance 0.3
+
+The first run on a machine records the baseline, by default in
+benchmarks/baseline.json. Baselines are machine specific, so that file is
+gitignored; record it on the machine that runs the gate.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from models.schemas import CommentData
+from services.sentiment_service import SentimentService
+from services.text_normalizer import clean_text
+from services.utils import extract_keywords
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+_POSITIVE = ["love", "great", "amazing", "helpful", "awesome", "brilliant", "thanks", "perfect"]
+_NEGATIVE = ["hate", "terrible", "boring", "awful", "worst", "annoying", "confusing", "bad"]
+_NEUTRAL = ["video", "python", "tutorial", "code", "music", "part", "channel", "editing",
+            "explanation", "example", "decorators", "minute", "audio", "series", "project"]
+_EXTRAS = ["😂", "🔥", "!!!", "https://example.com/watch", "@creator", "lol", "really", "not", "very"]
+
+def make_corpus(size: int, seed: int = 42) -> List[CommentData]:
+    """Deterministic synthetic comments with a realistic mix of tone, length and noise"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    comments = []
+    for index in range(size):
+        words = rng.choices(_NEUTRAL, k=rng.randint(3, 25))
+        tone = rng.random()
+        if tone < 0.45:
+            words += rng.choices(_POSITIVE, k=rng.randint(1, 3))
+        elif tone < 0.7:
+            words += rng.choices(_NEGATIVE, k=rng.randint(1, 3))
+        if rng.random() < 0.3:
+            words += rng.choices(_EXTRAS, k=rng.randint(1, 2))
+        rng.shuffle(words)
+        sentiment = "positive" if tone < 0.45 else "negative" if tone < 0.7 else "neutral"
+        comments.append(CommentData(
+            author=f"user{index % 5000}",
+            text=" ".join(words).capitalize(),
+            sentiment=sentiment,
+            sentiment_score=round(rng.uniform(-1, 1), 3),
+            likes=int(rng.paretovariate(1.2)) - 1,
+            published_at=(start + timedelta(minutes=index)).isoformat() + "Z",
+            weight=1 if rng.random() < 0.9 else rng.randint(2, 5)
+        ))
+    return comments
+
+def _benchmarks(sentiment_service: SentimentService) -> Dict[str, Callable[[List[CommentData]], object]]:
+    return {
+        "analyze_sentiment_advanced": lambda comments: [
+            sentiment_service.analyze_sentiment_advanced(comment.text) for comment in comments
+        ],
+        "clean_text": lambda comments: [clean_text(comment.text) for comment in comments],
+        "extract_keywords": lambda comments: extract_keywords(" ".join(comment.text for comment in comments)),
+        "calculate_sentiment_distribution": sentiment_service.calculate_sentiment_distribution,
+        "generate_sentiment_over_time": sentiment_service.generate_sentiment_over_time,
+        "generate_video_quality_score": lambda comments: [
+            sentiment_service.generate_video_quality_score(comment.text, ["a", "b", "c"], comment.text, 120, 0.2)
+            for comment in comments
+        ],
+    }
+
+def run_benchmark(function: Callable, comments: List[CommentData], repeat: int) -> dict:
+    function(comments[:100])  # Warm caches and lazy imports
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function(comments)
+        timings.append(time.perf_counter() - started)
+
+    # Memory is measured in a separate pass since tracing distorts timings
+    gc.collect()
+    tracemalloc.start()
+    function(comments)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "seconds": round(best, 6),
+        "throughput": round(len(comments) / best, 1) if best else float("inf"),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Describe every result that regresses past the tolerance against its baseline"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput']:.0f}/s vs baseline {reference['throughput']:.0f}/s"
+            )
+        # Small absolute growth is noise, whatever the ratio
+        if result["peak_kib"] > reference["peak_kib"] * (1 + tolerance) + 64:
+            regressions.append(
+                f"{name}: peak memory {result['peak_kib']:.0f} KiB vs baseline {reference['peak_kib']:.0f} KiB"
+            )
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("BENCH_TOLERANCE", "0.2")),
+                        help="allowed fractional regression (default 0.2, or $BENCH_TOLERANCE)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    args = parser.parse_args(argv)
+
+    benchmarks = _benchmarks(SentimentService())
+    if args.only:
+        benchmarks = {name: benchmarks[name] for name in args.only}
+
+    results = {}
+    for size in args.sizes:
+        comments = make_corpus(size)
+        for name, function in benchmarks.items():
+            key = f"{name}@{size}"
+            results[key] = run_benchmark(function, comments, args.repeat)
+            print(f"{key:<45} {results[key]['throughput']:>12.0f}/s {results[key]['peak_kib']:>12.1f} KiB")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.update_baseline or not baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+class Overloaded(Exception):
+    """Raised instead of admitting work the server has no capacity for"""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Bounds concurrent work per process, with a bounded wait queue.
+
+    At most max_inflight holders run at once and up to max_queue more wait
+    for a slot. Work arriving to a full queue is refused at once with 429;
+    work that waits longer than queue_timeout is refused with 503. Both
+    carry a Retry-After estimate from the recent average service time.
+    """
+
+    def __init__(self, name: str, max_inflight: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._active = 0
+        self._waiting = 0
+        self._avg_service_time = 1.0
+        self._total_rejected = 0
+
+    @property
+    def saturation(self) -> float:
+        """Share of in-flight and queue capacity in use"""
+        return (self._active + self._waiting) / (self.max_inflight + self.max_queue)
+
+    def retry_after(self) -> int:
+        # Time for the current queue to drain at the current service rate
+        backlog = (self._waiting / self.max_inflight) + 1
+        return max(1, min(60, int(round(self._avg_service_time * backlog))))
+
+    def _reject(self, message: str, status_code: int) -> Overloaded:
+        self._total_rejected += 1
+        return Overloaded(message, status_code, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block, or raise Overloaded.
+
+        timeout, when given, further caps the queue wait (e.g. at what is left
+        of the caller's deadline).
+        """
+        if not self._slots.locked():
+            # A free slot is taken without suspending, so a burst arriving in
+            # one tick cannot all see the slot as free
+            await self._slots.acquire()
+        elif self._waiting >= self.max_queue:
+            raise self._reject(f"{self.name} queue is full", 429)
+        else:
+            self._waiting += 1
+            try:
+                queue_timeout = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+                await asyncio.wait_for(self._slots.acquire(), queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(f"Timed out waiting for {self.name} capacity", 503)
+            finally:
+                self._waiting -= 1
+        
+        self._active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._slots.release()
+            # Exponentially weighted so Retry-After follows the current load
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * (time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "in_flight": self._active,
+            "queued": self._waiting,
+            "max_in_flight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "saturation": round(self.saturation, 3),
+            "avg_service_time": round(self._avg_service_time, 2),
+            "rejected": self._total_rejected,
+        }
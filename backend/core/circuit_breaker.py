@@ -0,0 +1,89 @@
+import time
+from typing import Optional
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+class CircuitBreaker:
+    """Circuit breaker for an upstream dependency.
+
+    Closed: calls pass through. After failure_threshold consecutive failures
+    (errors, timeouts or calls slower than slow_call_threshold seconds) the
+    circuit opens and calls are refused immediately. After recovery_timeout
+    seconds it goes half-open and lets half_open_max_calls trial calls
+    through: a success closes it, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_threshold: float = 10.0,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._total_rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being refused (no trial slot is consumed)"""
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        """Reserve permission for one call; every allowed call must be recorded or released"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+            self._half_open_in_flight += 1
+            return True
+        self._total_rejected += 1
+        return False
+
+    def release(self) -> None:
+        """Give back a permission that was not used for an upstream call"""
+        if self._state == self.HALF_OPEN and self._half_open_in_flight:
+            self._half_open_in_flight -= 1
+
+    def record_success(self, duration: float) -> None:
+        if duration > self.slow_call_threshold:
+            self.record_failure()
+            return
+        self._consecutive_failures = 0
+        # Only a trial call closes the circuit; a call that started before it
+        # opened and finishes late must not cut the cooldown short
+        if self._state == self.HALF_OPEN:
+            self._half_open_in_flight = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._half_open_in_flight = 0
+
+    def snapshot(self) -> dict:
+        state = self.state
+        return {
+            "name": self.name,
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_in": round(max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)), 1)
+                        if state == self.OPEN else 0.0,
+            "rejected_calls": self._total_rejected,
+        }
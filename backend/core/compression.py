@@ -0,0 +1,23 @@
+from typing import Sequence
+
+from starlette.middleware.gzip import GZipMiddleware # type: ignore
+from starlette.types import ASGIApp, Receive, Scope, Send # type: ignore
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses, except under paths that are already compressed or live streams.
+
+    Starlette's GZip buffers streamed bodies inside the compressor, which
+    would hold back NDJSON events, and it would re-compress gzip and
+    Parquet exports for no gain.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 6,
+                 exclude_paths: Sequence[str] = ()):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
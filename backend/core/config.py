@@ -1,4 +1,5 @@
 import os
+from typing import List, Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,10 +7,84 @@ class Settings(BaseSettings):
     youtube_api_key: str = os.getenv("YOUTUBE_API_KEY", "your_youtube_api_key_here")
     gemini_api_key: str = os.getenv("GEMINI_API_KEY", "your_gemini_api_key_here")
     
+    # Server
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    worker_timeout: int = 300
+    
+    # Shared cross-worker state
+    shared_store_path: str = "cache/shared_store.db"
+    shared_store_purge_interval: float = 3600.0
+    analysis_cache_ttl: int = 3600
+    inflight_lease_ttl: int = 300
+    inflight_poll_interval: float = 0.25
+    # Expired analyses are served for this much longer while a refresh runs
+    analysis_stale_ttl: int = 3600
+    
+    # Upstream quotas (per day, 0 disables the limit)
+    youtube_daily_quota: int = 10000
+    gemini_daily_requests: int = 1500
+    
     # API Configuration
     max_comments: int = 100
     max_transcript_length: int = 4000
+    # Model tokens for the condensed transcript sent in every transcript prompt
+    transcript_token_budget: int = 1000
     default_keywords_count: int = 10
+    include_replies: bool = False
+    max_replies_per_thread: int = 100
+    reply_fetch_concurrency: int = 8
+    
+    # Similar videos index
+    similarity_index_path: str = "cache/similarity.db"
+    
+    # Comment search index
+    comment_index_path: str = "cache/comments.db"
+    
+    # Analysis snapshot history for trends
+    history_store_path: str = "cache/history.db"
+    
+    # Bulk export
+    export_max_comments: int = 100000
+    
+    # Response compression
+    gzip_minimum_size: int = 1000
+    gzip_compresslevel: int = 6
+    
+    # Topic extraction: "gemini" (falling back to local) or "local"
+    topic_mode: Literal["gemini", "local"] = "gemini"
+    topic_count: int = 6
+    topic_max_chars: int = 20000
+    
+    # Streaming sketches for requests over max_comments. Each 100 comments
+    # cost one YouTube quota unit, charged up front for the whole stream.
+    sketch_max_comments: int = 20000
+    sketch_sample_size: int = 500
+    sketch_keyword_capacity: int = 200
+    
+    # Channel analysis
+    channel_max_videos: int = 50
+    channel_concurrency: int = 3
+    
+    # Background prefetch of watched videos and channels
+    prefetch_enabled: bool = False
+    prefetch_interval: float = 300.0
+    prefetch_refresh_ahead: float = 600.0
+    prefetch_concurrency: int = 1
+    prefetch_channel_videos: int = 5
+    prefetch_quota_reserve: float = 0.5
+    watchlist_videos: List[str] = []
+    watchlist_channels: List[str] = []
+    
+    # Transcript Store
+    transcript_cache_dir: str = "cache/transcripts"
+    transcript_languages: List[str] = ["en"]
+    
+    # Comment Deduplication
+    dedup_comments: bool = True
+    dedup_similarity: float = 0.7
+    dedup_min_tokens: int = 4
     
     # Quality Score Weights
     content_length_weight: float = 0.25
@@ -22,6 +97,38 @@ class Settings(BaseSettings):
     sentiment_threshold_positive: float = 0.1
     sentiment_threshold_negative: float = -0.1
     
+    # Deadlines (seconds)
+    gemini_call_timeout: float = 15.0
+    token_count_timeout: float = 5.0
+    analysis_deadline: float = 45.0
+    optional_stage_min_budget: float = 5.0
+    degraded_cache_ttl: int = 300
+    
+    # Admission control for analyses, per worker process
+    admission_max_inflight: int = 8
+    admission_max_queue: int = 16
+    admission_queue_timeout: float = 30.0
+    # /health/ready reports not ready at or above this saturation
+    readiness_max_saturation: float = 0.9
+    
+    # Gemini circuit breaker
+    gemini_breaker_failure_threshold: int = 5
+    gemini_breaker_slow_call: float = 10.0
+    gemini_breaker_recovery_timeout: float = 30.0
+    gemini_breaker_half_open_calls: int = 1
+    
+    # Emotion detection: "gemini" sends a sample to Gemini, "local" labels every
+    # comment with the offline lexicon classifier, "cascade" labels confident
+    # comments locally and escalates only ambiguous ones
+    emotion_mode: str = "gemini"
+    escalation_margin: float = 0.05
+    escalation_disagreement: float = 0.5
+    
+    # Representative comment sample sent to the comment keywords prompt
+    comment_sample_size: int = 40
+    comment_sample_max_chars: int = 3000
+    comment_sample_text_chars: int = 300
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,33 @@
+import time
+from typing import List
+
+class Deadline:
+    """End-to-end time budget for one analysis request.
+
+    Passed down through the pipeline stages, which size their upstream call
+    timeouts from the remaining budget and record here any stage they had
+    to skip or switch to a local fallback.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degraded_stages: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least the given number of seconds is left"""
+        return self.remaining() >= seconds
+
+    def timeout(self, per_call: float) -> float:
+        """Timeout for one upstream call: the per-call limit capped by the remaining budget"""
+        return min(per_call, self.remaining())
+
+    def degrade(self, stage: str) -> None:
+        if stage not in self.degraded_stages:
+            self.degraded_stages.append(stage)
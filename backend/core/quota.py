@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from core.shared_store import SharedStore, shared_store
+
+class QuotaExceeded(Exception):
+    """Raised when a daily upstream quota has been used up"""
+
+class QuotaCounter:
+    """Daily usage counter for an upstream API, shared across worker processes"""
+
+    def __init__(self, name: str, daily_limit: int, store: SharedStore = shared_store):
+        self.name = name
+        self.daily_limit = daily_limit
+        self.store = store
+
+    def _key(self) -> str:
+        return f"quota:{self.name}:{datetime.now(timezone.utc).strftime('%Y%m%d')}"
+
+    def consume(self, units: int = 1) -> None:
+        """Record usage, raising QuotaExceeded (without charging) when over the limit"""
+        key = self._key()
+        used = self.store.incr(key, units, ttl=2 * 24 * 3600)
+        if self.daily_limit and used > self.daily_limit:
+            self.store.incr(key, -units)
+            raise QuotaExceeded(f"{self.name} daily quota of {self.daily_limit} exhausted")
+
+    def refund(self, units: int) -> None:
+        """Give back units consumed up front but not used"""
+        if units > 0:
+            self.store.incr(self._key(), -units)
+
+    def used(self) -> int:
+        return self.store.get(self._key()) or 0
@@ -0,0 +1,32 @@
+from gunicorn.app.base import BaseApplication
+
+from core.config import settings
+from core.warmup import warm_nlp_resources
+
+class PreforkServer(BaseApplication):
+    """Gunicorn pre-fork server running uvicorn workers over an already loaded app"""
+
+    def __init__(self, app, options=None):
+        self.application = app
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+def run_prefork(app) -> None:
+    """Warm shared resources in the parent, then fork settings.workers workers"""
+    warm_nlp_resources()
+    options = {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": settings.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": settings.worker_timeout,
+    }
+    PreforkServer(app, options).run()
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from core.config import settings
+from core.logger import logger
+
+class SharedStore:
+    """Key/value store shared by every worker process on this host.
+
+    Backed by a SQLite database in WAL mode so concurrent readers never block,
+    with per-key expiry. Connections are opened lazily per thread and per
+    process, so an instance created before a pre-fork is safe to use in the
+    forked workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value, or None if missing or expired"""
+        row = self._connection().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, optionally expiring after ttl seconds"""
+        expires_at = time.time() + ttl if ttl else None
+        self._connection().execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, separators=(',', ':')), expires_at)
+        )
+
+    def update(self, key: str, update: Callable[[Optional[Any]], Any], ttl: Optional[float] = None) -> Any:
+        """Atomically replace a value with update(current value or None) and return it"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            value = update(json.loads(row[0]) if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, separators=(',', ':')), now + ttl if ttl else None)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add to an integer counter and return the new value"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            value = (json.loads(row[0]) if row else 0) + amount
+            if row:
+                conn.execute("UPDATE kv SET value = ? WHERE key = ?", (json.dumps(value), key))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now + ttl if ttl else None)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        """Take an exclusive, expiring lease; returns False if another holder has it"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            if not row:
+                conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(os.getpid()), now + ttl)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return not row
+
+    def renew_lease(self, key: str, ttl: float) -> bool:
+        """Extend a lease held by this process; returns False if it was lost"""
+        cursor = self._connection().execute(
+            "UPDATE kv SET expires_at = ? WHERE key = ? AND value = ? AND expires_at > ?",
+            (time.time() + ttl, key, json.dumps(os.getpid()), time.time())
+        )
+        return cursor.rowcount > 0
+
+    def release_lease(self, key: str) -> None:
+        """Drop a lease held by this process; a lease that expired and was taken over is left alone"""
+        self._connection().execute(
+            "DELETE FROM kv WHERE key = ? AND value = ?", (key, json.dumps(os.getpid()))
+        )
+
+    def purge_expired(self) -> None:
+        self._connection().execute(
+            "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+
+async def purge_expired_periodically(store: SharedStore, interval: float) -> None:
+    """Delete expired rows every interval seconds.
+
+    Expired rows are otherwise only replaced when their key is written
+    again, so per-video cache entries and per-day quota counters would
+    accumulate forever.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(store.purge_expired)
+        except Exception as e:
+            logger.warning(f"Purging expired shared store rows failed: {e}")
+        await asyncio.sleep(interval)
+
+shared_store = SharedStore(settings.shared_store_path)
@@ -0,0 +1,26 @@
+import gc
+
+from core.logger import logger
+
+def warm_nlp_resources() -> None:
+    """Load NLTK, TextBlob and VADER data into memory.
+
+    Called in the parent process before workers are forked so the loaded
+    corpora, lexicons and tokenizer models are shared copy-on-write.
+    """
+    from textblob import TextBlob
+    from services.sentiment_service import SentimentService
+    from services.utils import extract_keywords
+
+    sample = "Warming up the language resources for faster analysis, great videos!"
+    try:
+        TextBlob(sample).sentiment
+        SentimentService().analyze_sentiment_advanced(sample)
+        extract_keywords(sample)
+    except Exception as e:
+        logger.warning(f"NLP resource warm-up incomplete: {e}")
+    
+    # Move everything loaded so far out of the collector's generations so
+    # garbage collection in the workers does not dirty the shared pages
+    gc.collect()
+    gc.freeze()
@@ -1,8 +1,15 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import router
+from fastapi.responses import JSONResponse
+from api.routes import router, prefetch_scheduler, analysis_admission
+from core.admission import Overloaded
+from core.compression import SelectiveGZipMiddleware
 from core.config import settings
 from core.logger import logger
+from core.shared_store import purge_expired_periodically, shared_store
+from services.gemini_service import gemini_breaker
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -20,9 +27,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses; exports are gzipped already and channel events must not be held back
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compresslevel,
+    exclude_paths=["/export", "/analyze/channel"],
+)
+
 # Include routes
 app.include_router(router)
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Shed load fast, telling clients when to come back"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.purge_task = asyncio.create_task(
+        purge_expired_periodically(shared_store, settings.shared_store_purge_interval)
+    )
+    if settings.prefetch_enabled:
+        prefetch_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.purge_task.cancel()
+    await prefetch_scheduler.stop()
+
 @app.get("/")
 async def root():
     return {"message": "InsightTube API is running!"}
@@ -32,11 +69,30 @@ async def health_check():
     """Health check endpoint"""
     from datetime import datetime
     return {
-        "status": "healthy",
+        "status": "healthy" if not gemini_breaker.is_open() else "degraded",
         "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "circuits": {"gemini": gemini_breaker.snapshot()},
+        "admission": analysis_admission.snapshot()
     }
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness for load balancers: 503 while this worker is saturated"""
+    admission = analysis_admission.snapshot()
+    ready = analysis_admission.saturation < settings.readiness_max_saturation
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "admission": admission},
+        headers={} if ready else {"Retry-After": str(analysis_admission.retry_after())}
+    )
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    if settings.workers > 1:
+        from core.server import run_prefork
+        run_prefork(app)
+    else:
+        import uvicorn
+        from core.warmup import warm_nlp_resources
+        warm_nlp_resources()
+        uvicorn.run(app, host=settings.host, port=settings.port)
\ No newline at end of file
@@ -1,9 +1,37 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, Field, field_validator
 from typing import List, Dict, Optional, Any
 
-class VideoAnalysisRequest(BaseModel):
+class AnalysisOptions(BaseModel):
+    include_comments: bool = True
+    include_sentiment: bool = True
+    include_topics: bool = True
+    include_keywords: bool = True
+    include_summary: bool = True
+    include_replies: bool = False
+    # Emotion stages call Gemini per sampled comment (emotion_mode "gemini"), so they are opt-in
+    include_emotion: bool = False
+    # Requests above settings.max_comments are streamed, up to settings.sketch_max_comments
+    max_comments: int = Field(default=100, ge=1, le=100000)
+    emotion_sample_size: int = Field(default=20, ge=0, le=100)
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+    # Top-level AnalysisResponse sections to return; None returns all of them
+    fields: Optional[List[str]] = None
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value):
+        # Query strings carry the list as "summary,topics"
+        if isinstance(value, str):
+            return [field.strip() for field in value.split(",") if field.strip()]
+        return value
+
+class VideoAnalysisRequest(AnalysisOptions):
     video_url: str
 
+class ChannelAnalysisRequest(AnalysisOptions):
+    channel_url: str
+    max_videos: int = Field(default=10, ge=1)
+
 class VideoInfo(BaseModel):
     title: str
     channel: str
@@ -14,6 +42,10 @@ class VideoInfo(BaseModel):
     dislikes: int
     comments: int
     description: str
+    # Raw values behind the display strings above
+    view_count: int = 0
+    channel_id: str = ""
+    published_at: str = ""
 
 class TopicAnalysis(BaseModel):
     topic: str
@@ -25,6 +57,13 @@ class SentimentDistribution(BaseModel):
     value: float
     color: str
 
+class NormalizedText(BaseModel):
+    """Per-text normalization artifact shared by the sentiment, keyword and emotion stages"""
+    cleaned: str
+    tokens: List[str]
+    lemmas: List[str]
+    exclamations: int = 0
+
 class CommentData(BaseModel):
     author: str
     text: str
@@ -32,6 +71,20 @@ class CommentData(BaseModel):
     sentiment_score: float
     likes: int
     published_at: str
+    weight: int = 1
+    comment_id: Optional[str] = None
+    parent_id: Optional[str] = None
+    # Raw TextBlob / VADER scores, kept in-process for cascade decisions
+    polarity: Optional[float] = Field(default=None, exclude=True)
+    vader_score: Optional[float] = Field(default=None, exclude=True)
+    normalized: Optional[NormalizedText] = Field(default=None, exclude=True)
+    # Distinct authors of every member of a duplicate group (None for a single comment)
+    group_authors: Optional[List[str]] = Field(default=None, exclude=True)
+
+class TranscriptEntry(BaseModel):
+    text: str
+    start: float
+    duration: float
 
 class CommentAnalysisDetail(BaseModel):
     total_comments: int
@@ -41,6 +94,10 @@ class CommentAnalysisDetail(BaseModel):
     sentiment_distribution_detailed: Dict[str, int]
     emotion_distribution: Dict[str, int]
     quality_score: float
+    emotion_escalation_rate: Optional[float] = None
+    aggregation: str = "exact"
+    unique_commenters: Optional[int] = None
+    sentiment_quantiles: Optional[Dict[str, float]] = None
 
 class VideoAnalysisDetail(BaseModel):
     transcript_keywords: List[str]
@@ -62,4 +119,93 @@ class AnalysisResponse(BaseModel):
     sentiment_over_time: List[SentimentOverTime]
     top_comments: List[CommentData]
     video_analysis_detail: VideoAnalysisDetail
-    processing_time: float
\ No newline at end of file
+    processing_time: float
+    skipped_stages: List[str] = []
+    degraded_stages: List[str] = []
+
+class SimilarVideo(BaseModel):
+    video_id: str
+    title: str
+    score: float
+    shared_terms: List[str]
+
+class SimilarVideosResponse(BaseModel):
+    video_id: str
+    similar: List[SimilarVideo]
+
+class CommentSearchHit(BaseModel):
+    video_id: str
+    comment_id: str
+    author: str
+    text: str
+    sentiment: str
+    sentiment_score: float
+    likes: int
+    published_at: str
+    weight: int = 1
+    snippet: Optional[str] = None
+
+class CommentSearchResponse(BaseModel):
+    query: str
+    results: List[CommentSearchHit]
+
+class Watchlist(BaseModel):
+    videos: List[str] = []
+    channels: List[str] = []
+
+class ChannelVideoPoint(BaseModel):
+    video_id: str
+    title: str
+    published_at: str
+    avg_sentiment: float
+    positive: float
+    negative: float
+    engagement_rate: float
+
+class TermCount(BaseModel):
+    term: str
+    videos: int
+
+class ChannelAggregate(BaseModel):
+    channel_id: str
+    channel_title: str
+    videos_planned: int
+    videos_analyzed: int
+    videos_failed: int
+    sentiment_trend: List[ChannelVideoPoint]
+    recurring_topics: List[TermCount]
+    recurring_keywords: List[TermCount]
+    engagement_distribution: Dict[str, float]
+    complete: bool = False
+
+class VideoSnapshot(BaseModel):
+    captured_at: str
+    view_count: int
+    like_count: int
+    comment_count: int
+    positive: Optional[float] = None
+    neutral: Optional[float] = None
+    negative: Optional[float] = None
+    avg_sentiment: Optional[float] = None
+    engagement_rate: Optional[float] = None
+    quality_score: Optional[float] = None
+    comments_analyzed: int
+    degraded: bool = False
+
+class VideoTrendResponse(BaseModel):
+    video_id: str
+    title: str
+    snapshots: List[VideoSnapshot]
+
+class ChannelTrendPoint(BaseModel):
+    period: str
+    videos: int
+    view_count: int
+    like_count: int
+    comment_count: int
+    avg_sentiment: Optional[float] = None
+
+class ChannelTrendResponse(BaseModel):
+    channel_id: str
+    interval: str
+    points: List[ChannelTrendPoint]
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.config import settings
+from core.shared_store import SharedStore, shared_store
+from core.logger import logger
+
+class AnalysisCache:
+    """Analysis result cache with in-flight deduplication across workers.
+
+    Concurrent requests for the same key in one process await a single task;
+    across processes a shared lease ensures only one worker computes while
+    the others wait for the result to land in the shared store.
+
+    Entries stay in the store for analysis_stale_ttl past their freshness
+    TTL. A stale entry is returned immediately while a single background
+    refresh recomputes it (stale-while-revalidate).
+
+    Each entry records an ETag (a hash of the value) and when it was
+    stored, so HTTP validators can be answered without the value itself.
+
+    The store does SQLite I/O that can wait on other workers' write locks,
+    so the async paths call it through asyncio.to_thread.
+    """
+
+    def __init__(self, store: SharedStore = shared_store, ttl: Optional[float] = None,
+                 stale_ttl: Optional[float] = None):
+        self.store = store
+        self.ttl = ttl or settings.analysis_cache_ttl
+        self.stale_ttl = settings.analysis_stale_ttl if stale_ttl is None else stale_ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _entry(self, key: str) -> Optional[dict]:
+        entry = self.store.get(f"analysis:{key}")
+        # Entries written before etags were recorded count as misses
+        return entry if entry and "etag" in entry else None
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached value for key, fresh or stale"""
+        entry = self._entry(key)
+        return entry["value"] if entry else None
+
+    def _fresh(self, key: str, ahead: float = 0) -> Optional[dict]:
+        entry = self._entry(key)
+        return entry if entry and entry["fresh_until"] - time.time() > ahead else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> dict:
+        ttl = ttl or self.ttl
+        now = time.time()
+        entry = {
+            "value": value,
+            "etag": hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:32],
+            "stored_at": now,
+            "fresh_until": now + ttl
+        }
+        self.store.set(f"analysis:{key}", entry, ttl=ttl + self.stale_ttl)
+        return entry
+
+    def refresh_due(self, key: str, ahead: float = 0) -> bool:
+        """True if key is missing, stale, or goes stale within `ahead` seconds"""
+        return self._fresh(key, ahead) is None
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             ttl_for: Optional[Callable[[Any], Optional[float]]] = None) -> Any:
+        """Return the cached value for key, computing it at most once across workers.
+
+        ttl_for may pick a per-value TTL, e.g. a shorter one for degraded results.
+        """
+        return (await self.get_or_compute_entry(key, compute, ttl_for))["value"]
+
+    async def get_or_compute_entry(self, key: str, compute: Callable[[], Awaitable[Any]],
+                                   ttl_for: Optional[Callable[[Any], Optional[float]]] = None) -> dict:
+        """Like get_or_compute, but returns the whole entry with its etag and timestamps"""
+        entry = await asyncio.to_thread(self._entry, key)
+        if entry is not None:
+            if entry["fresh_until"] <= time.time():
+                self.refresh(key, compute, ttl_for)
+            return entry
+
+        return await asyncio.shield(self.refresh(key, compute, ttl_for))
+
+    def refresh(self, key: str, compute: Callable[[], Awaitable[Any]],
+                ttl_for: Optional[Callable[[Any], Optional[float]]] = None,
+                ahead: float = 0) -> asyncio.Task:
+        """Start recomputing key, or join the computation already running in this process.
+
+        Entries that stay fresh for more than `ahead` seconds are kept as they are.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_once(key, compute, ttl_for, ahead))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Surface failures of background refreshes nobody is awaiting
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Computing {key} failed: {task.exception()}")
+
+    async def _compute_once(self, key: str, compute: Callable[[], Awaitable[Any]],
+                            ttl_for: Optional[Callable[[Any], Optional[float]]] = None,
+                            ahead: float = 0) -> dict:
+        lease_key = f"inflight:{key}"
+        while not await asyncio.to_thread(self.store.acquire_lease, lease_key, settings.inflight_lease_ttl):
+            # Another worker is computing this key; wait for its result
+            await asyncio.sleep(settings.inflight_poll_interval)
+            cached = await asyncio.to_thread(self._fresh, key, ahead)
+            if cached is not None:
+                logger.info(f"Served {key} from a result computed by another worker")
+                return cached
+
+        try:
+            cached = await asyncio.to_thread(self._fresh, key, ahead)
+            if cached is not None:
+                return cached
+            value = await compute()
+            return await asyncio.to_thread(self.set, key, value, ttl_for(value) if ttl_for else None)
+        finally:
+            await asyncio.to_thread(self.store.release_lease, lease_key)
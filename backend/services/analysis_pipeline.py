@@ -0,0 +1,243 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from models.schemas import (
+    AnalysisResponse, CommentAnalysisDetail, CommentData, TopicAnalysis
+)
+from services.youtube_service import YouTubeService
+from services.gemini_service import GeminiService
+from services.sentiment_service import SentimentService
+from services.analysis_planner import AnalysisPlan
+from services.similarity_index import SimilarityIndex
+from services.comment_index import CommentIndex
+from services.history_store import HistoryStore
+from services.comment_stream import CommentStreamAggregator
+from services.topic_service import topic_extractor
+from core.config import settings
+from core.deadline import Deadline
+from core.logger import logger
+from core.quota import QuotaExceeded
+from googleapiclient.errors import HttpError
+
+class AnalysisPipeline:
+    """Runs the stages of an AnalysisPlan for one video.
+
+    Independent upstream fetches run concurrently, and stages or fetches the
+    plan leaves out are never started. A per-request Deadline is passed to
+    every Gemini-backed stage; optional stages are skipped or run locally
+    when it runs low, and are reported as degraded.
+
+    Finished analyses are added to the similarity index and their scored
+    comments to the comment search index, and a snapshot of each is kept in
+    the history store, when those are given.
+    """
+
+    def __init__(self, youtube_service: YouTubeService, gemini_service: GeminiService,
+                 sentiment_service: SentimentService, similarity_index: Optional[SimilarityIndex] = None,
+                 comment_index: Optional[CommentIndex] = None, history_store: Optional[HistoryStore] = None):
+        self.youtube_service = youtube_service
+        self.gemini_service = gemini_service
+        self.sentiment_service = sentiment_service
+        self.similarity_index = similarity_index
+        self.comment_index = comment_index
+        self.history_store = history_store
+
+    async def _fetch_comments(self, video_id: str, plan: AnalysisPlan) -> List[CommentData]:
+        if not plan.fetches_comments():
+            return []
+        return await self.youtube_service.get_video_comments(
+            video_id, max_results=plan.max_comments, include_replies=plan.include_replies
+        )
+
+    async def _stream_comments(self, video_id: str, plan: AnalysisPlan,
+                               deadline: Deadline) -> CommentStreamAggregator:
+        """Score comment pages as they arrive and fold them into fixed-size sketches.
+
+        The quota for every page is charged before the first request, and
+        what goes unused is refunded. The stream stops early, and is reported
+        as degraded, once the deadline leaves too little for the later stages.
+        """
+        aggregator = CommentStreamAggregator(include_emotion=plan.includes("emotion"))
+        limit = min(plan.max_comments, settings.sketch_max_comments)
+        reserved = await self.youtube_service.reserve_comment_pages(limit)
+        fetched = 0
+        pages = self.youtube_service.iter_comment_pages(video_id, limit, plan.include_replies, prepaid=True)
+        try:
+            async for page in pages:
+                fetched += 1
+                aggregator.add(self.youtube_service.score_comments(page))
+                if not deadline.allows(settings.optional_stage_min_budget):
+                    deadline.degrade("comments")
+                    break
+        except (HttpError, QuotaExceeded) as e:
+            logger.error(f"Error streaming comments: {e}")
+        finally:
+            await pages.aclose()
+            await asyncio.to_thread(self.youtube_service.quota.refund, reserved - fetched)
+        return aggregator
+
+    async def _fetch_transcript(self, video_id: str, plan: AnalysisPlan) -> str:
+        if not plan.fetches_transcript():
+            return ""
+        return await self.youtube_service.get_video_transcript(video_id)
+
+    async def _summary(self, transcript: str, description: str, plan: AnalysisPlan,
+                       deadline: Deadline) -> str:
+        if not plan.includes("summary"):
+            return ""
+        return await self.gemini_service.generate_summary(transcript, description, deadline)
+
+    async def _topics(self, transcript: str, description: str, plan: AnalysisPlan,
+                      deadline: Deadline) -> List[TopicAnalysis]:
+        if not plan.includes("topics"):
+            return []
+        if settings.topic_mode == "local":
+            return await asyncio.to_thread(topic_extractor.extract, transcript, description)
+        if not deadline.allows(settings.optional_stage_min_budget) or not self.gemini_service.is_available():
+            deadline.degrade("topics")
+            return await asyncio.to_thread(topic_extractor.extract, transcript, description)
+        return await self.gemini_service.extract_topics(transcript, description, deadline)
+
+    async def _comment_analysis(self, comments: List[CommentData], plan: AnalysisPlan,
+                                deadline: Deadline, stream: Optional[CommentStreamAggregator] = None) -> dict:
+        if stream is not None:
+            return stream.analysis(include_keywords=plan.includes("comment_keywords"))
+        emotion_sample_size = plan.emotion_sample_size if plan.includes("emotion") else 0
+        return await self.sentiment_service.analyze_comments_comprehensive(
+            comments, emotion_sample_size=emotion_sample_size,
+            include_keywords=plan.includes("comment_keywords"), deadline=deadline
+        )
+
+    async def _index(self, video_id: str, title: str, topics: List[TopicAnalysis],
+                     transcript_keywords: List[str], comments: List[CommentData],
+                     comment_keywords: List[str], transcript: str) -> None:
+        if self.similarity_index is not None:
+            try:
+                await asyncio.to_thread(
+                    self.similarity_index.add_analysis, video_id, title,
+                    [topic.topic for topic in topics], transcript_keywords, comment_keywords,
+                    transcript[:settings.max_transcript_length]
+                )
+            except Exception as e:
+                logger.warning(f"Could not index {video_id} for similarity: {e}")
+        if self.comment_index is not None and comments:
+            try:
+                await asyncio.to_thread(self.comment_index.add_comments, video_id, comments)
+            except Exception as e:
+                logger.warning(f"Could not index comments of {video_id} for search: {e}")
+
+    async def run(self, video_id: str, plan: AnalysisPlan,
+                  deadline: Optional[Deadline] = None) -> AnalysisResponse:
+        """Analyze a video according to the plan, within deadline if one was already started"""
+        start_time = datetime.now()
+        deadline = deadline or Deadline(plan.deadline_seconds)
+        
+        # Fetch video information, comments and transcript concurrently.
+        # Very large comment requests are streamed into sketches instead, and
+        # a uniform sample of them stands in for the comment list below.
+        stream = None
+        if plan.streams_comments():
+            video_info, stream, transcript = await asyncio.gather(
+                self.youtube_service.get_video_info_enhanced(video_id),
+                self._stream_comments(video_id, plan, deadline),
+                self._fetch_transcript(video_id, plan)
+            )
+            comments = stream.sample_comments()
+        else:
+            video_info, comments, transcript = await asyncio.gather(
+                self.youtube_service.get_video_info_enhanced(video_id),
+                self._fetch_comments(video_id, plan),
+                self._fetch_transcript(video_id, plan)
+            )
+        
+        # Summary, topics and comment analysis are independent of each other
+        summary, topics, comment_analysis_data = await asyncio.gather(
+            self._summary(transcript, video_info.description, plan, deadline),
+            self._topics(transcript, video_info.description, plan, deadline),
+            self._comment_analysis(comments, plan, deadline, stream)
+        )
+        
+        # Sentiment distribution and timeline
+        if plan.includes("sentiment"):
+            if stream is not None:
+                sentiment_distribution = self.sentiment_service.sentiment_distribution_from_counts(
+                    {label.lower(): count for label, count in stream.sentiments.items()}
+                )
+            else:
+                sentiment_distribution = self.sentiment_service.calculate_sentiment_distribution(comments)
+            sentiment_over_time = self.sentiment_service.generate_sentiment_over_time(comments)
+        else:
+            sentiment_distribution = []
+            sentiment_over_time = []
+        
+        # Comprehensive transcript analysis
+        total_comments = stream.total if stream is not None else sum(comment.weight for comment in comments)
+        engagement_rate = self.youtube_service.calculate_engagement_rate(total_comments, video_info.view_count)
+        video_analysis = await self.sentiment_service.analyze_transcript_comprehensive(
+            transcript, summary, total_comments, engagement_rate,
+            include_keywords=plan.includes("transcript_keywords"),
+            include_emotion=plan.includes("transcript_emotion"),
+            deadline=deadline
+        )
+        
+        # Prepare detailed comment analysis, weighting duplicate groups by size
+        if stream is not None:
+            avg_sentiment = stream.scores.mean
+        else:
+            scored = [comment for comment in comments if comment.sentiment_score != 0]
+            scored_weight = sum(comment.weight for comment in scored)
+            avg_sentiment = (
+                sum(comment.sentiment_score * comment.weight for comment in scored) / scored_weight
+                if scored_weight else 0.0
+            )
+        
+        comment_analysis = CommentAnalysisDetail(
+            total_comments=total_comments,
+            avg_sentiment=round(avg_sentiment, 2),
+            engagement_rate=round(engagement_rate, 2),
+            top_keywords=comment_analysis_data["top_keywords"],
+            sentiment_distribution_detailed=comment_analysis_data["sentiment_distribution_detailed"],
+            emotion_distribution=comment_analysis_data["emotion_distribution"],
+            quality_score=video_analysis.content_quality_score,
+            emotion_escalation_rate=comment_analysis_data["emotion_escalation_rate"],
+            aggregation="sketch" if stream is not None else "exact",
+            unique_commenters=(
+                stream.commenters.count() if stream is not None
+                else len({author for comment in comments for author in comment.group_authors or [comment.author]})
+            ),
+            sentiment_quantiles=stream.score_quantiles() if stream is not None else None
+        )
+        
+        # Get top comments
+        top_comments = []
+        if plan.includes("top_comments"):
+            if stream is not None:
+                top_comments = stream.top_comments()
+            else:
+                top_comments = sorted(comments, key=lambda x: x.likes, reverse=True)[:5]
+        
+        await self._index(video_id, video_info.title, topics, video_analysis.transcript_keywords,
+                          comments, comment_analysis.top_keywords, transcript)
+        
+        processing_time = (datetime.now() - start_time).total_seconds()
+        
+        response = AnalysisResponse(
+            video_info=video_info,
+            summary=summary,
+            topics=topics,
+            sentiment_distribution=sentiment_distribution,
+            comment_analysis=comment_analysis,
+            sentiment_over_time=sentiment_over_time,
+            top_comments=top_comments,
+            video_analysis_detail=video_analysis,
+            processing_time=round(processing_time, 2),
+            skipped_stages=plan.skipped_stages,
+            degraded_stages=deadline.degraded_stages
+        )
+        if self.history_store is not None:
+            try:
+                await asyncio.to_thread(self.history_store.record, video_id, response)
+            except Exception as e:
+                logger.warning(f"Could not record a history snapshot of {video_id}: {e}")
+        return response
@@ -0,0 +1,118 @@
+import hashlib
+from typing import Any, Dict, List, Optional, Set
+
+from models.schemas import AnalysisOptions
+from core.config import settings
+
+# Upstream fetch each analysis stage depends on
+STAGE_DEPENDENCIES = {
+    "top_comments": "comments",
+    "sentiment": "comments",
+    "emotion": "comments",
+    "comment_keywords": "comments",
+    "summary": "transcript",
+    "topics": "transcript",
+    "transcript_keywords": "transcript",
+    "transcript_emotion": "transcript",
+}
+
+ANALYSIS_STAGES = list(STAGE_DEPENDENCIES)
+
+# Stages that feed each selectable AnalysisResponse section
+RESPONSE_SECTIONS = {
+    "video_info": set(),
+    "summary": {"summary"},
+    "topics": {"topics"},
+    "sentiment_distribution": {"sentiment"},
+    "sentiment_over_time": {"sentiment"},
+    "comment_analysis": {"sentiment", "emotion", "comment_keywords"},
+    "top_comments": {"top_comments"},
+    "video_analysis_detail": {"transcript_keywords", "transcript_emotion"},
+}
+
+# Sections returned whatever fields are selected
+ALWAYS_RETURNED = ("processing_time", "skipped_stages", "degraded_stages")
+
+class AnalysisPlan:
+    """The set of stages and upstream fetches one analysis request needs"""
+
+    def __init__(self, stages: Set[str], max_comments: int = 100,
+                 include_replies: bool = False, emotion_sample_size: int = 20,
+                 deadline_seconds: Optional[float] = None):
+        self.stages = set(stages)
+        self.fetches = {STAGE_DEPENDENCIES[stage] for stage in self.stages}
+        self.max_comments = max_comments
+        self.include_replies = include_replies
+        self.emotion_sample_size = emotion_sample_size
+        # A run must finish before its in-flight lease lapses and another worker starts it again
+        self.deadline_seconds = min(deadline_seconds or settings.analysis_deadline, settings.inflight_lease_ttl)
+
+    def includes(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def fetches_comments(self) -> bool:
+        return "comments" in self.fetches
+
+    def streams_comments(self) -> bool:
+        """Beyond the exact-analysis cap, comments are summarized in fixed memory"""
+        return self.fetches_comments() and self.max_comments > settings.max_comments
+
+    def fetches_transcript(self) -> bool:
+        return "transcript" in self.fetches
+
+    @property
+    def skipped_stages(self) -> List[str]:
+        return [stage for stage in ANALYSIS_STAGES if stage not in self.stages]
+
+    def cache_key(self, video_id: str) -> str:
+        """Cache key covering everything that changes the result"""
+        signature = "|".join([
+            ",".join(sorted(self.stages)),
+            str(self.max_comments),
+            str(self.include_replies),
+            str(self.emotion_sample_size),
+        ])
+        return f"{video_id}:{hashlib.sha1(signature.encode()).hexdigest()[:12]}"
+
+def build_plan(request: AnalysisOptions) -> AnalysisPlan:
+    """Translate request options into an execution plan, dropping unrequested stages"""
+    stages = set()
+    
+    if request.include_comments:
+        stages.add("top_comments")
+    
+    if request.include_sentiment:
+        stages.add("sentiment")
+    
+    if request.include_emotion and request.emotion_sample_size > 0:
+        stages.update({"emotion", "transcript_emotion"})
+    
+    if request.include_keywords:
+        stages.update({"comment_keywords", "transcript_keywords"})
+    
+    if request.include_topics:
+        stages.add("topics")
+    
+    if request.include_summary:
+        stages.add("summary")
+    
+    # A field selection also drops the stages no selected section needs
+    if request.fields is not None:
+        unknown = sorted(set(request.fields) - set(RESPONSE_SECTIONS))
+        if unknown:
+            raise ValueError(f"Unknown response fields: {', '.join(unknown)}")
+        stages &= set().union(*(RESPONSE_SECTIONS[field] for field in request.fields))
+    
+    return AnalysisPlan(
+        stages,
+        max_comments=request.max_comments,
+        include_replies=request.include_replies,
+        emotion_sample_size=request.emotion_sample_size,
+        deadline_seconds=request.deadline_seconds
+    )
+
+def project_response(response: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Limit a serialized AnalysisResponse to the selected sections"""
+    if fields is None:
+        return response
+    return {key: value for key, value in response.items() if key in fields or key in ALWAYS_RETURNED}
@@ -0,0 +1,147 @@
+import asyncio
+import statistics
+from collections import Counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+from models.schemas import ChannelAggregate, ChannelVideoPoint, TermCount
+from services.youtube_service import YouTubeService
+from services.analysis_planner import AnalysisPlan
+from core.config import settings
+from core.logger import logger
+
+AnalyzeVideo = Callable[[str, AnalysisPlan], Awaitable[dict]]
+
+class ChannelAggregator:
+    """Incrementally folds per-video analyses into channel-level aggregates"""
+
+    def __init__(self, channel: dict, videos: List[dict], stats: Dict[str, dict], top_n: int = 10):
+        self.channel = channel
+        self.videos = {video["video_id"]: video for video in videos}
+        self.stats = stats
+        self.top_n = top_n
+        self.points: List[ChannelVideoPoint] = []
+        self.topic_counts = Counter()
+        self.keyword_counts = Counter()
+        self.engagement: List[float] = []
+        self.failed = 0
+
+    def add(self, video_id: str, analysis: dict) -> None:
+        video = self.videos[video_id]
+        comment_analysis = analysis["comment_analysis"]
+
+        counts = {label.upper(): value for label, value in comment_analysis["sentiment_distribution_detailed"].items()}
+        total = sum(counts.values()) or 1
+        engagement_rate = self._engagement_rate(video_id, comment_analysis)
+
+        self.points.append(ChannelVideoPoint(
+            video_id=video_id,
+            title=video["title"],
+            published_at=video["published_at"],
+            avg_sentiment=comment_analysis["avg_sentiment"],
+            positive=round(counts.get("POSITIVE", 0) / total * 100, 1),
+            negative=round(counts.get("NEGATIVE", 0) / total * 100, 1),
+            engagement_rate=round(engagement_rate, 4)
+        ))
+        self.engagement.append(engagement_rate)
+
+        # Count each term once per video so one video cannot dominate
+        self.topic_counts.update({topic["topic"].strip().lower() for topic in analysis["topics"]})
+        self.keyword_counts.update(
+            {keyword.strip().lower() for keyword in comment_analysis["top_keywords"]}
+            | {keyword.strip().lower() for keyword in analysis["video_analysis_detail"]["transcript_keywords"]}
+        )
+
+    def fail(self) -> None:
+        self.failed += 1
+
+    def _engagement_rate(self, video_id: str, comment_analysis: dict) -> float:
+        """(likes + comments) / views from raw statistics, else the per-video rate"""
+        stats = self.stats.get(video_id)
+        if stats and stats["views"]:
+            return (stats["likes"] + stats["comments"]) / stats["views"] * 100
+        return comment_analysis["engagement_rate"]
+
+    @staticmethod
+    def _terms(counts: Counter, n: int) -> List[TermCount]:
+        return [TermCount(term=term, videos=videos) for term, videos in counts.most_common(n) if term]
+
+    def _distribution(self) -> Dict[str, float]:
+        if not self.engagement:
+            return {}
+        values = sorted(self.engagement)
+        quartiles = statistics.quantiles(values, n=4) if len(values) > 1 else [values[0]] * 3
+        return {
+            "min": round(values[0], 4),
+            "p25": round(quartiles[0], 4),
+            "median": round(quartiles[1], 4),
+            "p75": round(quartiles[2], 4),
+            "max": round(values[-1], 4),
+            "mean": round(statistics.fmean(values), 4),
+        }
+
+    def snapshot(self, complete: bool = False) -> ChannelAggregate:
+        return ChannelAggregate(
+            channel_id=self.channel["channel_id"],
+            channel_title=self.channel["title"],
+            videos_planned=len(self.videos),
+            videos_analyzed=len(self.points),
+            videos_failed=self.failed,
+            sentiment_trend=sorted(self.points, key=lambda point: point.published_at),
+            recurring_topics=self._terms(self.topic_counts, self.top_n),
+            recurring_keywords=self._terms(self.keyword_counts, self.top_n),
+            engagement_distribution=self._distribution(),
+            complete=complete
+        )
+
+class ChannelAnalyzer:
+    """Runs the per-video analysis across a channel's uploads.
+
+    Videos are analyzed with bounded parallelism through analyze_video, which
+    is expected to go through the shared analysis cache so channel runs and
+    single-video requests reuse each other's results. Events are yielded as
+    each video finishes, each carrying the aggregate so far.
+    """
+
+    def __init__(self, youtube_service: YouTubeService, analyze_video: AnalyzeVideo):
+        self.youtube_service = youtube_service
+        self.analyze_video = analyze_video
+
+    async def resolve(self, kind: str, value: str, max_videos: int) -> tuple:
+        """Resolve a channel and list its most recent uploads"""
+        channel = await self.youtube_service.resolve_channel(kind, value)
+        max_videos = min(max_videos, settings.channel_max_videos)
+        videos = await self.youtube_service.get_playlist_videos(channel["uploads_playlist_id"], max_videos)
+        return channel, videos
+
+    async def run(self, channel: dict, videos: List[dict], plan: AnalysisPlan) -> AsyncIterator[Dict[str, Any]]:
+        stats = await self.youtube_service.get_video_statistics([video["video_id"] for video in videos])
+        aggregator = ChannelAggregator(channel, videos, stats)
+        semaphore = asyncio.Semaphore(settings.channel_concurrency)
+
+        async def analyze(video_id: str):
+            async with semaphore:
+                try:
+                    return video_id, await self.analyze_video(video_id, plan), None
+                except Exception as e:
+                    logger.error(f"Channel analysis failed for video {video_id}: {e}")
+                    return video_id, None, getattr(e, "detail", None) or str(e) or type(e).__name__
+
+        tasks = [asyncio.create_task(analyze(video["video_id"])) for video in videos]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                video_id, analysis, error = await next_result
+                if analysis is None:
+                    aggregator.fail()
+                    yield {"event": "error", "video_id": video_id, "detail": error,
+                           "aggregate": aggregator.snapshot().model_dump()}
+                else:
+                    aggregator.add(video_id, analysis)
+                    yield {"event": "video", "video_id": video_id,
+                           "aggregate": aggregator.snapshot().model_dump()}
+        finally:
+            # The client may disconnect mid-stream; drop videos not yet started.
+            # Analyses already running are shielded and still land in the cache.
+            for task in tasks:
+                task.cancel()
+
+        yield {"event": "complete", "aggregate": aggregator.snapshot(complete=True).model_dump()}
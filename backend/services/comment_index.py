@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from models.schemas import CommentData, CommentSearchHit
+from services.text_normalizer import TOKEN_PATTERN, normalized_for
+from core.config import settings
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS comments (
+        id INTEGER PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        comment_id TEXT NOT NULL,
+        author TEXT NOT NULL,
+        text TEXT NOT NULL,
+        normalized TEXT NOT NULL,
+        sentiment TEXT NOT NULL,
+        sentiment_score REAL NOT NULL,
+        likes INTEGER NOT NULL,
+        published_at TEXT NOT NULL,
+        weight INTEGER NOT NULL,
+        indexed_at REAL NOT NULL,
+        UNIQUE (video_id, comment_id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS comments_video ON comments (video_id, sentiment, likes)",
+    "CREATE INDEX IF NOT EXISTS comments_likes ON comments (likes)",
+    "CREATE INDEX IF NOT EXISTS comments_published ON comments (published_at)",
+    # External-content FTS5 table over the normalized text, kept in sync by triggers
+    """CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+        normalized, content='comments', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS comments_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO comments_fts (rowid, normalized) VALUES (new.id, new.normalized);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_ad AFTER DELETE ON comments BEGIN
+        INSERT INTO comments_fts (comments_fts, rowid, normalized) VALUES ('delete', old.id, old.normalized);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_au AFTER UPDATE OF normalized ON comments BEGIN
+        INSERT INTO comments_fts (comments_fts, rowid, normalized) VALUES ('delete', old.id, old.normalized);
+        INSERT INTO comments_fts (rowid, normalized) VALUES (new.id, new.normalized);
+    END""",
+]
+
+SORT_ORDERS = {
+    "relevance": "bm25(comments_fts)",
+    "likes": "c.likes DESC",
+    "recent": "c.published_at DESC",
+}
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match, `word*` matches a prefix"""
+    terms = []
+    for match in TOKEN_PATTERN.finditer(text):
+        term = '"' + match.group(0).lower().replace('"', '') + '"'
+        if text[match.end():match.end() + 1] == "*":
+            term += "*"
+        terms.append(term)
+    return " ".join(terms)
+
+class CommentIndex:
+    """Full-text index over scored comments, across all analyzed videos.
+
+    Comments are stored in SQLite with an FTS5 index over their normalized
+    text (porter-stemmed), plus B-tree indexes on video, sentiment, likes and
+    publish date for filtering. Re-indexing a video updates its comments in
+    place, keyed by comment id.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.comment_index_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add_comments(self, video_id: str, comments: List[CommentData]) -> int:
+        """Insert or update a video's comments; returns the number indexed"""
+        now = time.time()
+        rows = [
+            (
+                video_id, comment.comment_id, comment.author, comment.text,
+                normalized_for(comment).cleaned, comment.sentiment, comment.sentiment_score,
+                comment.likes, comment.published_at, comment.weight, now
+            )
+            for comment in comments if comment.comment_id
+        ]
+        if not rows:
+            return 0
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO comments (video_id, comment_id, author, text, normalized, sentiment, "
+                "sentiment_score, likes, published_at, weight, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (video_id, comment_id) DO UPDATE SET "
+                "author = excluded.author, text = excluded.text, normalized = excluded.normalized, "
+                "sentiment = excluded.sentiment, sentiment_score = excluded.sentiment_score, "
+                "likes = excluded.likes, weight = excluded.weight, indexed_at = excluded.indexed_at",
+                rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def search(self, query: str = "", video_id: Optional[str] = None, sentiment: Optional[str] = None,
+               min_score: Optional[float] = None, max_score: Optional[float] = None,
+               min_likes: Optional[int] = None, since: Optional[str] = None, until: Optional[str] = None,
+               sort: str = "relevance", limit: int = 50, offset: int = 0) -> List[CommentSearchHit]:
+        """Comments matching every word of query (if any) and all given filters"""
+        match = fts_query(query)
+        conditions, params = [], []
+        if match:
+            conditions.append("comments_fts MATCH ?")
+            params.append(match)
+        for clause, value in (
+            ("c.video_id = ?", video_id),
+            ("c.sentiment = ?", sentiment.lower() if sentiment else None),
+            ("c.sentiment_score >= ?", min_score),
+            ("c.sentiment_score <= ?", max_score),
+            ("c.likes >= ?", min_likes),
+            ("c.published_at >= ?", since),
+            ("c.published_at < ?", until),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+
+        if match:
+            source = "comments_fts JOIN comments c ON c.id = comments_fts.rowid"
+            snippet = "snippet(comments_fts, 0, '[', ']', '…', 12)"
+            order = SORT_ORDERS.get(sort, SORT_ORDERS["relevance"])
+        else:
+            source = "comments c"
+            snippet = "NULL"
+            order = SORT_ORDERS["recent"] if sort == "relevance" else SORT_ORDERS.get(sort, SORT_ORDERS["recent"])
+
+        sql = (
+            f"SELECT c.video_id, c.comment_id, c.author, c.text, c.sentiment, c.sentiment_score, "
+            f"c.likes, c.published_at, c.weight, {snippet} FROM {source}"
+            + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+            + f" ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        rows = self._connection().execute(sql, params + [limit, offset]).fetchall()
+        return [
+            CommentSearchHit(
+                video_id=row[0], comment_id=row[1], author=row[2], text=row[3], sentiment=row[4],
+                sentiment_score=row[5], likes=row[6], published_at=row[7], weight=row[8], snippet=row[9]
+            )
+            for row in rows
+        ]
+
+comment_index = CommentIndex()
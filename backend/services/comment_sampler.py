@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from models.schemas import CommentData
+from services.text_normalizer import normalized_for
+
+TIME_BUCKETS = 4
+# Share of comments, by like count, that form the "popular" tier
+POPULAR_SHARE = 0.2
+
+def representative_sample(comments: List[CommentData], size: int,
+                          max_chars: Optional[int] = None, text_chars: Optional[int] = None) -> List[CommentData]:
+    """A small subset of comments that mirrors the whole for LLM-bound stages.
+
+    Comments with the same cleaned text are kept once, and the most liked
+    copy is used. The rest are stratified by sentiment label, popularity
+    (the top fifth by likes or the rest) and quarter of the comment
+    timeline. Each stratum gets a share of the sample proportional to the
+    comments it holds, counting duplicate groups by weight, and at least one
+    while the size allows. Within a stratum the most liked comments go first.
+
+    The sample interleaves strata, so a character budget that cuts it short
+    still spans them. With max_chars, comments are added while their
+    cleaned text (cut to text_chars) still fits.
+    """
+    if size <= 0 or not comments:
+        return []
+
+    unique: Dict[str, CommentData] = {}
+    for comment in comments:
+        key = normalized_for(comment).cleaned
+        if key and (key not in unique or comment.likes > unique[key].likes):
+            unique[key] = comment
+    candidates = list(unique.values())
+    if not candidates:
+        return []
+
+    by_time = sorted(range(len(candidates)), key=lambda index: candidates[index].published_at)
+    time_bucket = {index: rank * TIME_BUCKETS // len(candidates) for rank, index in enumerate(by_time)}
+    likes = sorted((comment.likes for comment in candidates), reverse=True)
+    popular_threshold = likes[int(len(likes) * POPULAR_SHARE)] if len(likes) > 1 else 0
+
+    strata: Dict[Tuple[str, bool, int], List[CommentData]] = defaultdict(list)
+    for index, comment in enumerate(candidates):
+        strata[(comment.sentiment, comment.likes > popular_threshold, time_bucket[index])].append(comment)
+    for members in strata.values():
+        members.sort(key=lambda comment: (comment.likes, len(comment.text)), reverse=True)
+
+    # Proportional allocation by weight, largest remainders first, at least one per stratum
+    weights = {key: sum(comment.weight for comment in members) for key, members in strata.items()}
+    total_weight = sum(weights.values())
+    order = sorted(strata, key=weights.get, reverse=True)
+    ideal = {key: size * weights[key] / total_weight for key in order}
+    quotas = {key: min(len(strata[key]), int(ideal[key])) for key in order}
+    priority = sorted(order, key=lambda key: (quotas[key] > 0, -(ideal[key] - int(ideal[key]))))
+    remaining = size - sum(quotas.values())
+    while remaining > 0:
+        open_strata = [key for key in priority if quotas[key] < len(strata[key])][:remaining]
+        if not open_strata:
+            break
+        for key in open_strata:
+            quotas[key] += 1
+        remaining -= len(open_strata)
+
+    sample, used = [], 0
+    for position in range(max(quotas.values())):
+        for key in order:
+            if position >= quotas[key]:
+                continue
+            comment = strata[key][position]
+            length = len(normalized_for(comment).cleaned[:text_chars]) + 1
+            if max_chars is not None and used + length > max_chars:
+                continue
+            sample.append(comment)
+            used += length
+    return sample
@@ -0,0 +1,75 @@
+from collections import Counter
+from typing import Dict, List, Optional
+
+from models.schemas import CommentData
+from services.emotion_service import emotion_classifier
+from services.sketches import HeavyHitters, HyperLogLog, ReservoirSample, StreamingStats, TopK
+from services.text_normalizer import normalized_for
+from core.config import settings
+
+class CommentStreamAggregator:
+    """Comment analysis over a stream of scored comment pages in fixed memory.
+
+    Replaces the full comment list and exact keyword Counter for very large
+    videos. Keywords come from a Count-Min heavy-hitters sketch, unique
+    commenters from HyperLogLog, and score mean and quantiles from streaming
+    stats. A uniform reservoir sample stands in for the comment list where
+    one is needed, and an exact heap keeps the most liked comments. Label
+    counts are exact since the label sets are fixed. Emotions are labelled
+    locally for every comment. See services.sketches for error bounds.
+    """
+
+    def __init__(self, include_emotion: bool = True, sample_size: Optional[int] = None,
+                 keyword_capacity: Optional[int] = None, top_n: int = 5):
+        self.include_emotion = include_emotion
+        self.total = 0
+        self.sentiments = Counter()
+        self.emotions = Counter()
+        self.scores = StreamingStats()
+        self.commenters = HyperLogLog()
+        self.keywords = HeavyHitters(keyword_capacity or settings.sketch_keyword_capacity)
+        self.sample = ReservoirSample(sample_size or settings.sketch_sample_size)
+        self.top = TopK(top_n, key=lambda item: item[1].likes)
+        self._position = 0
+
+    def add(self, comments: List[CommentData]) -> None:
+        for comment in comments:
+            weight = comment.weight
+            self.total += weight
+            self.sentiments[comment.sentiment.upper()] += weight
+            if comment.sentiment_score != 0:
+                self.scores.add(comment.sentiment_score, weight)
+            for author in comment.group_authors or [comment.author]:
+                self.commenters.add(author)
+
+            normalized = normalized_for(comment)
+            for lemma in normalized.lemmas:
+                self.keywords.add(lemma, weight)
+            if self.include_emotion:
+                self.emotions[emotion_classifier.classify_normalized(normalized)] += weight
+
+            # Positions keep the sample in arrival order for the timeline
+            self.sample.add((self._position, comment))
+            self.top.add((self._position, comment))
+            self._position += 1
+
+    def sample_comments(self) -> List[CommentData]:
+        return [comment for _, comment in sorted(self.sample.items, key=lambda item: item[0])]
+
+    def top_comments(self) -> List[CommentData]:
+        return [comment for _, comment in self.top.items()]
+
+    def top_keywords(self, n: int) -> List[str]:
+        return [keyword for keyword, _ in self.keywords.top(n)]
+
+    def score_quantiles(self) -> Dict[str, float]:
+        return {f"p{int(q * 100)}": round(self.scores.quantile(q), 3) for q in (0.1, 0.25, 0.5, 0.75, 0.9)}
+
+    def analysis(self, include_keywords: bool = True) -> dict:
+        """The summary in the shape returned by analyze_comments_comprehensive"""
+        return {
+            "sentiment_distribution_detailed": dict(self.sentiments),
+            "emotion_distribution": dict(self.emotions),
+            "emotion_escalation_rate": None,
+            "top_keywords": self.top_keywords(settings.default_keywords_count) if include_keywords else []
+        }
@@ -0,0 +1,85 @@
+import re
+import random
+from typing import Dict, List, Set
+
+from core.config import settings
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_REPEATED_CHARS = re.compile(r"(\w)\1{2,}")
+_WHITESPACE = re.compile(r"\s+")
+
+SHINGLE_SIZE = 4
+NUM_PERMUTATIONS = 32
+LSH_BANDS = 8
+_HASH_MASK = (1 << 64) - 1
+# XOR with a random mask permutes the 64-bit hash space, giving a cheap
+# family of permutations for MinHash
+_rng = random.Random(1729)
+_PERMUTATION_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERMUTATIONS)]
+
+def normalize_for_dedup(text: str) -> str:
+    """Normalize cleaned comment text so trivially different copies compare equal"""
+    text = _NON_WORD.sub(" ", text.lower())
+    text = _REPEATED_CHARS.sub(r"\1\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def _shingles(text: str) -> Set[int]:
+    """Hashes of the character shingles of a normalized text.
+
+    Uses the built-in string hash, so signatures are only comparable within
+    one process; they are never persisted.
+    """
+    return {hash(text[i:i + SHINGLE_SIZE]) & _HASH_MASK for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+
+def minhash(text: str) -> List[int]:
+    """MinHash signature of a normalized text over its character shingles"""
+    hashes = _shingles(text)
+    return [min(h ^ mask for h in hashes) for mask in _PERMUTATION_MASKS]
+
+def group_duplicates(texts: List[str], similarity: float = None, min_tokens: int = None) -> List[List[int]]:
+    """Group indices of exact and near-duplicate texts.
+
+    Texts are first bucketed by normalized form. Representatives with at least
+    min_tokens words are then sketched with MinHash and bucketed by LSH bands;
+    candidates sharing a band are merged when their estimated Jaccard
+    similarity reaches the threshold. Returns groups in order of first appearance.
+    """
+    similarity = settings.dedup_similarity if similarity is None else similarity
+    min_tokens = settings.dedup_min_tokens if min_tokens is None else min_tokens
+    
+    exact: Dict[str, List[int]] = {}
+    for index, text in enumerate(texts):
+        exact.setdefault(normalize_for_dedup(text), []).append(index)
+    
+    keys = list(exact)
+    parent = list(range(len(keys)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    buckets: Dict[tuple, List[int]] = {}
+    signatures: Dict[int, List[int]] = {}
+    
+    for key_index, key in enumerate(keys):
+        if len(key.split()) < min_tokens:
+            continue
+        signature = minhash(key)
+        signatures[key_index] = signature
+        for band in range(LSH_BANDS):
+            bucket = buckets.setdefault((band, *signature[band * rows:(band + 1) * rows]), [])
+            for other in bucket:
+                if find(other) == find(key_index):
+                    continue
+                matches = sum(x == y for x, y in zip(signature, signatures[other]))
+                if matches / NUM_PERMUTATIONS >= similarity:
+                    parent[find(key_index)] = find(other)
+            bucket.append(key_index)
+    
+    groups: Dict[int, List[int]] = {}
+    for key_index, key in enumerate(keys):
+        groups.setdefault(find(key_index), []).extend(exact[key])
+    return sorted((sorted(group) for group in groups.values()), key=lambda group: group[0])
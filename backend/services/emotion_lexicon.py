@@ -0,0 +1,115 @@
+"""Bundled emotion lexicon for the offline emotion classifier.
+
+Maps words, a few two-word phrases and common emoji to one of the emotion
+labels used by the API, with a weight expressing how strongly each
+signals it. Words that are mostly filler in comments ("like", "really")
+are left out.
+"""
+
+_JOY = {
+    1.0: """glad happy happier happiest joy joyful enjoy enjoyed enjoying enjoyable fun funny
+        nice good great cool liked pleased pleasant cheerful smile smiling smiled
+        laugh laughing laughed lol haha hahaha lmao rofl grateful thankful thanks thank
+        thx appreciate appreciated helpful useful beautiful lovely cute sweet relaxing
+        satisfying satisfied proud hope hopeful excited exciting wow yay yey hooray bless
+        blessed congrats congratulations celebrate inspiring inspired inspiration wholesome
+        delight delighted delightful win winning won success successful recommend""",
+    1.5: """love loved loving loves awesome amazing excellent fantastic wonderful brilliant
+        perfect perfection masterpiece incredible outstanding superb phenomenal legendary
+        legend goat best greatest epic stunning gorgeous adore adorable ecstatic thrilled
+        euphoric overjoyed""",
+}
+
+_SADNESS = {
+    1.0: """sad sadly sadness unhappy cry crying cried tears tear miss missed missing
+        lonely alone lost lose losing loss sorry regret regrets disappointed disappointing
+        disappointment depressing depressed hurt hurts hurting pain painful broken
+        sigh unfortunate unfortunately gloomy grief grieving mourn mourning rip farewell
+        goodbye nostalgia nostalgic melancholy hopeless helpless tired exhausted""",
+    1.5: """heartbroken heartbreaking devastated devastating tragic tragedy miserable
+        despair sobbing crushed""",
+}
+
+_ANGER = {
+    1.0: """angry anger mad annoyed annoying annoy irritating irritated frustrating
+        frustrated frustration hate hated hates hating stupid idiot idiots dumb ridiculous
+        nonsense trash garbage rubbish worst terrible awful unacceptable scam scammer
+        clickbait liar lying lies fake shame shameful pathetic useless waste wasted rant
+        outrage offensive rude toxic unfair boycott""",
+    1.5: """furious rage raging enraged livid infuriating infuriated hateful disgraceful""",
+}
+
+_FEAR = {
+    1.0: """fear afraid scared scary scare frightening frightened nervous anxious anxiety
+        worried worry worrying worries panic panicking terror concerned concern danger
+        dangerous risky threat threatening creepy spooky uneasy dread insecure unsafe
+        alarming alarmed""",
+    1.5: """terrified terrifying horrified horrifying petrified nightmare""",
+}
+
+_SURPRISE = {
+    1.0: """surprise surprised surprising unexpected unexpectedly suddenly sudden whoa woah
+        omg wtf unbelievable shocked shock shocking astonished astonishing amazed
+        speechless mindblowing stunned""",
+    1.5: """mind-blowing jawdropping jaw-dropping""",
+}
+
+_DISGUST = {
+    1.0: """disgust disgusting disgusted gross nasty yuck eww ew sickening vile
+        repulsive revolting cringe cringy cringey creep filthy dirty foul rotten
+        distasteful""",
+    1.5: """nauseating repugnant abhorrent""",
+}
+
+EMOJI_LEXICON = {
+    "😂": ("Joy", 1.0), "🤣": ("Joy", 1.0), "😀": ("Joy", 1.0), "😃": ("Joy", 1.0),
+    "😄": ("Joy", 1.0), "😁": ("Joy", 1.0), "😊": ("Joy", 1.0), "🙂": ("Joy", 0.5),
+    "😍": ("Joy", 1.5), "🥰": ("Joy", 1.5), "❤": ("Joy", 1.0), "❤️": ("Joy", 1.0),
+    "💕": ("Joy", 1.0), "👍": ("Joy", 0.5), "🔥": ("Joy", 1.0), "🙏": ("Joy", 0.5),
+    "🎉": ("Joy", 1.0), "👏": ("Joy", 1.0), "😢": ("Sadness", 1.0), "😭": ("Sadness", 1.5),
+    "😞": ("Sadness", 1.0), "😔": ("Sadness", 1.0), "💔": ("Sadness", 1.5), "😡": ("Anger", 1.5),
+    "😠": ("Anger", 1.0), "🤬": ("Anger", 1.5), "👎": ("Anger", 0.5), "😨": ("Fear", 1.0),
+    "😱": ("Fear", 1.5), "😰": ("Fear", 1.0), "😮": ("Surprise", 1.0), "😲": ("Surprise", 1.0),
+    "🤯": ("Surprise", 1.5), "😳": ("Surprise", 1.0), "🤢": ("Disgust", 1.5), "🤮": ("Disgust", 1.5),
+    "😒": ("Disgust", 0.5),
+}
+
+def _build_lexicon():
+    lexicon = {}
+    for emotion, groups in (("Joy", _JOY), ("Sadness", _SADNESS), ("Anger", _ANGER),
+                            ("Fear", _FEAR), ("Surprise", _SURPRISE), ("Disgust", _DISGUST)):
+        for weight, words in groups.items():
+            for word in words.split():
+                lexicon[word] = (emotion, weight)
+    lexicon.update(EMOJI_LEXICON)
+    return lexicon
+
+EMOTION_LEXICON = _build_lexicon()
+
+# Two-word entries, matched before their words are looked up on their own.
+# Words that only carry an emotion in context ("wait", "down") live here
+# rather than in the single-word lists.
+PHRASE_LEXICON = {
+    ("plot", "twist"): ("Surprise", 1.0),
+    ("wait", "what"): ("Surprise", 1.0),
+    ("mind", "blown"): ("Surprise", 1.5),
+    ("feeling", "down"): ("Sadness", 1.0),
+    ("feel", "down"): ("Sadness", 1.0),
+    ("let", "down"): ("Sadness", 1.0),
+    ("grossed", "out"): ("Disgust", 1.0),
+}
+
+NEGATIONS = {
+    "not", "no", "never", "nothing", "nobody", "none", "neither", "nor", "without",
+    "cannot", "cant", "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent",
+    "wont", "wouldnt", "shouldnt", "couldnt", "aint", "hardly", "barely",
+}
+
+# Multipliers applied to the next emotion word
+INTENSIFIERS = {
+    "very": 1.5, "really": 1.4, "so": 1.4, "too": 1.3, "extremely": 1.8, "super": 1.5,
+    "absolutely": 1.7, "totally": 1.5, "completely": 1.5, "incredibly": 1.7, "truly": 1.4,
+    "deeply": 1.5, "highly": 1.4, "most": 1.3, "literally": 1.3, "insanely": 1.7,
+    "slightly": 0.5, "somewhat": 0.6, "kinda": 0.6, "kind": 0.7, "sort": 0.7, "bit": 0.6,
+    "little": 0.6, "barely": 0.4, "mildly": 0.5,
+}
@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from models.schemas import NormalizedText
+from services.emotion_lexicon import EMOTION_LEXICON, PHRASE_LEXICON, NEGATIONS, INTENSIFIERS
+from services.text_normalizer import TOKEN_PATTERN
+
+EMOTIONS = ["Joy", "Sadness", "Anger", "Fear", "Surprise", "Disgust", "Neutral"]
+
+_REPEATED_CHARS = re.compile(r"(\w)\1{2,}")
+_SUFFIXES = ("ing", "ed", "ly", "es", "s")
+
+NEGATION_WINDOW = 3
+
+@lru_cache(maxsize=65536)
+def _lookup(token: str) -> Optional[tuple]:
+    """Lexicon entry for a lowercased token, trying common inflections"""
+    entry = EMOTION_LEXICON.get(token)
+    if entry is None:
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                entry = EMOTION_LEXICON.get(token[:-len(suffix)])
+                if entry:
+                    break
+    return entry
+
+class EmotionClassifier:
+    """Offline lexicon-based emotion classifier.
+
+    Produces the same labels as GeminiService.detect_emotion_with_gemini.
+    Each lexicon hit (a word or a two-word phrase) adds its weight to its
+    emotion, scaled by an intensifier in the two preceding tokens, by
+    shouting (all caps) and by elongation ("sooo").
+    A negation within the previous three tokens turns joy into mild sadness
+    and cancels the other emotions. Exclamation marks amplify the total.
+    Texts whose best score stays below min_score are Neutral.
+    """
+
+    def __init__(self, min_score: float = 0.5):
+        self.min_score = min_score
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text)
+
+    def score_tokens(self, tokens: Sequence[str], exclamations: int = 0) -> Dict[str, float]:
+        """Accumulated emotion scores for a token sequence"""
+        scores = {emotion: 0.0 for emotion in EMOTIONS}
+        multiplier = 1.0
+        intensified_until = -1
+        negated_until = -1
+        phrase_until = -1
+        
+        for index, raw in enumerate(tokens):
+            if index <= phrase_until:
+                continue
+            word = raw.lower().replace("'", "")
+            
+            if word in NEGATIONS or raw.lower().endswith("n't"):
+                negated_until = index + NEGATION_WINDOW
+                continue
+            if word in INTENSIFIERS:
+                multiplier *= INTENSIFIERS[word]
+                intensified_until = index + 2
+                continue
+            if index > intensified_until:
+                multiplier = 1.0
+            
+            boost = 1.0
+            entry = PHRASE_LEXICON.get((word, tokens[index + 1].lower())) if index + 1 < len(tokens) else None
+            if entry is not None:
+                phrase_until = index + 1
+            else:
+                entry = _lookup(word)
+            if entry is None:
+                collapsed = _REPEATED_CHARS.sub(r"\1", word)
+                if collapsed != word:
+                    entry = _lookup(collapsed) or _lookup(_REPEATED_CHARS.sub(r"\1\1", word))
+                    boost = 1.3
+            if entry is None:
+                continue
+            
+            emotion, weight = entry
+            if raw.isupper() and len(raw) > 1:
+                boost *= 1.5
+            value = weight * multiplier * boost
+            multiplier = 1.0
+            
+            if index <= negated_until:
+                if emotion == "Joy":
+                    scores["Sadness"] += value * 0.5
+                continue
+            scores[emotion] += value
+        
+        if exclamations:
+            factor = 1 + 0.1 * min(exclamations, 3)
+            scores = {emotion: score * factor for emotion, score in scores.items()}
+        return scores
+
+    def classify_tokens(self, tokens: Sequence[str], exclamations: int = 0) -> str:
+        scores = self.score_tokens(tokens, exclamations)
+        emotion = max(scores, key=scores.get)
+        return emotion if scores[emotion] >= self.min_score else "Neutral"
+
+    def classify(self, text: str) -> str:
+        """Classify a single text into one of EMOTIONS"""
+        return self.classify_tokens(self.tokenize(text), text.count("!"))
+
+    def classify_normalized(self, normalized: NormalizedText) -> str:
+        """Classify from a precomputed normalization artifact"""
+        return self.classify_tokens(normalized.tokens, normalized.exclamations)
+
+emotion_classifier = EmotionClassifier()
@@ -0,0 +1,181 @@
+import asyncio
+import io
+import json
+import zlib
+from collections import Counter
+from typing import AsyncIterator, List, Optional
+
+from models.schemas import CommentData, VideoInfo
+from services.youtube_service import YouTubeService
+from services.emotion_service import emotion_classifier
+from services.comment_index import CommentIndex
+from services.text_normalizer import normalized_for
+from core.config import settings
+from core.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/gzip", "ndjson.gz"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# API pages hold at most 100 threads; buffer them into larger row groups
+PARQUET_ROW_GROUP_ROWS = 10000
+
+def parquet_available() -> bool:
+    return pq is not None
+
+class ExportAggregates:
+    """Per-video totals accumulated while comment pages stream past"""
+
+    def __init__(self, video_id: str, video_info: VideoInfo):
+        self.video_id = video_id
+        self.video_info = video_info
+        self.total = 0
+        self.likes = 0
+        self.score_sum = 0.0
+        self.sentiments = Counter()
+        self.emotions = Counter()
+
+    def add(self, row: dict) -> None:
+        self.total += 1
+        self.likes += row["likes"]
+        self.score_sum += row["sentiment_score"]
+        self.sentiments[row["sentiment"]] += 1
+        self.emotions[row["emotion"]] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "video_info": self.video_info.model_dump(),
+            "total_comments": self.total,
+            "total_likes": self.likes,
+            "avg_sentiment": round(self.score_sum / self.total, 4) if self.total else 0.0,
+            "sentiment_counts": dict(self.sentiments),
+            "emotion_counts": dict(self.emotions),
+        }
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back in chunks.
+
+    tell() keeps counting across drains so Parquet footer offsets stay valid.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ExportService:
+    """Streams every comment of a video, scored, as compressed NDJSON or Parquet.
+
+    Comments are fetched, scored and encoded one API page at a time, so memory
+    stays bounded by the page size regardless of how many comments a video
+    has. Exports keep every comment (no deduplication), and emotions come from
+    the local classifier since per-comment Gemini calls don't scale to this.
+    Per-video aggregates are written once the last page is done: as a final
+    NDJSON record, or as key/value metadata in the Parquet footer.
+
+    Exported comments are also added to the comment search index, if given.
+    """
+
+    def __init__(self, youtube_service: YouTubeService, comment_index: Optional[CommentIndex] = None):
+        self.youtube_service = youtube_service
+        self.comment_index = comment_index
+
+    def _rows(self, comments: List[CommentData]) -> List[dict]:
+        return [
+            {
+                "comment_id": comment.comment_id,
+                "parent_id": comment.parent_id,
+                "author": comment.author,
+                "text": comment.text,
+                "likes": comment.likes,
+                "published_at": comment.published_at,
+                "sentiment": comment.sentiment,
+                "sentiment_score": comment.sentiment_score,
+                "emotion": emotion_classifier.classify_normalized(normalized_for(comment)),
+            }
+            for comment in comments
+        ]
+
+    async def _row_pages(self, video_id: str, aggregates: ExportAggregates, max_comments: int,
+                         include_replies: bool) -> AsyncIterator[List[dict]]:
+        limit = min(max_comments, settings.export_max_comments)
+        async for page in self.youtube_service.iter_comment_pages(video_id, limit, include_replies):
+            comments = self.youtube_service.score_comments(page, dedup=False)
+            if self.comment_index is not None:
+                await asyncio.to_thread(self.comment_index.add_comments, video_id, comments)
+            rows = self._rows(comments)
+            for row in rows:
+                aggregates.add(row)
+            yield rows
+
+    async def export(self, video_id: str, video_info: VideoInfo, export_format: str,
+                     max_comments: int, include_replies: bool = False) -> AsyncIterator[bytes]:
+        aggregates = ExportAggregates(video_id, video_info)
+        pages = self._row_pages(video_id, aggregates, max_comments, include_replies)
+        encode = self._parquet if export_format == "parquet" else self._ndjson_gzip
+        try:
+            async for chunk in encode(pages, aggregates):
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            # Headers are already sent; a truncated body is all we can signal
+            logger.error(f"Export of {video_id} failed: {e}")
+            raise
+
+    @staticmethod
+    async def _ndjson_gzip(pages: AsyncIterator[List[dict]], aggregates: ExportAggregates) -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+        async for rows in pages:
+            lines = "".join(json.dumps({"record": "comment", **row}) + "\n" for row in rows)
+            yield compressor.compress(lines.encode())
+        aggregate = json.dumps({"record": "aggregate", **aggregates.to_dict()}) + "\n"
+        yield compressor.compress(aggregate.encode())
+        yield compressor.flush()
+
+    @staticmethod
+    async def _parquet(pages: AsyncIterator[List[dict]], aggregates: ExportAggregates) -> AsyncIterator[bytes]:
+        schema = pa.schema([
+            ("comment_id", pa.string()), ("parent_id", pa.string()), ("author", pa.string()),
+            ("text", pa.string()), ("likes", pa.int64()), ("published_at", pa.string()),
+            ("sentiment", pa.string()), ("sentiment_score", pa.float64()), ("emotion", pa.string()),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        buffered: List[dict] = []
+        async for rows in pages:
+            buffered.extend(rows)
+            if len(buffered) >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_pylist(buffered, schema=schema))
+                buffered = []
+                yield sink.drain()
+        if buffered:
+            writer.write_table(pa.Table.from_pylist(buffered, schema=schema))
+        # add_key_value_metadata needs pyarrow >= 15
+        writer.add_key_value_metadata({"insighttube.aggregates": json.dumps(aggregates.to_dict())})
+        writer.close()
+        yield sink.drain()
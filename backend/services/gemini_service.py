@@ -1,44 +1,182 @@
 import json
 import re
+import time
 import asyncio
-from typing import List
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
 import google.generativeai as genai
 
 from models.schemas import TopicAnalysis
 from core.config import settings
 from core.logger import logger
+from core.quota import QuotaCounter, QuotaExceeded
+from core.deadline import Deadline
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.emotion_service import emotion_classifier
+from services.topic_service import topic_extractor
+from services.transcript_compressor import transcript_compressor
+
+# Condensed transcripts by transcript and budget, shared like the breaker
+CONDENSED_CACHE_SIZE = 64
+_condensed_transcripts: Dict[str, asyncio.Task] = OrderedDict()
+
+# Shared by every GeminiService instance in the process
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.gemini_breaker_failure_threshold,
+    slow_call_threshold=settings.gemini_breaker_slow_call,
+    recovery_timeout=settings.gemini_breaker_recovery_timeout,
+    half_open_max_calls=settings.gemini_breaker_half_open_calls
+)
 
 class GeminiService:
     def __init__(self):
         genai.configure(api_key=settings.gemini_api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.quota = QuotaCounter("gemini", settings.gemini_daily_requests)
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether model calls are currently being let through the circuit breaker"""
+        return not gemini_breaker.is_open()
+
+    async def _generate(self, prompt: str, deadline: Optional[Deadline] = None) -> str:
+        """Run one native async model call under a timeout, charging the shared daily quota.
+
+        The timeout is settings.gemini_call_timeout, capped by what is left of
+        the request deadline; raises asyncio.TimeoutError when nothing is left
+        and CircuitOpenError while the circuit breaker refuses calls.
+        """
+        timeout = deadline.timeout(settings.gemini_call_timeout) if deadline else settings.gemini_call_timeout
+        if timeout <= 0:
+            raise asyncio.TimeoutError("Analysis deadline exhausted")
+        
+        if not gemini_breaker.allow_request():
+            raise CircuitOpenError("Gemini circuit is open")
+        try:
+            # A SharedStore write, kept off the event loop
+            await asyncio.to_thread(self.quota.consume)
+        except BaseException:
+            # QuotaExceeded, or cancelled while charging: the permit was not used
+            gemini_breaker.release()
+            raise
+        
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self.model.generate_content_async(prompt), timeout=timeout)
+            text = response.text
+        except asyncio.CancelledError:
+            # The caller went away mid-call; this says nothing about Gemini's health,
+            # but a half-open trial slot must be given back or no trial runs again
+            gemini_breaker.release()
+            raise
+        except Exception:
+            gemini_breaker.record_failure()
+            raise
+        gemini_breaker.record_success(time.monotonic() - start)
+        return text
+
+    async def count_tokens(self, text: str, deadline: Optional[Deadline] = None) -> Optional[int]:
+        """Model token count of text, or None if it could not be measured in time.
+
+        Charged to the daily quota and accounted in the circuit breaker like
+        any other model call.
+        """
+        timeout = deadline.timeout(settings.token_count_timeout) if deadline else settings.token_count_timeout
+        if timeout <= 0 or not gemini_breaker.allow_request():
+            return None
+        try:
+            await asyncio.to_thread(self.quota.consume)
+        except QuotaExceeded:
+            gemini_breaker.release()
+            return None
+        except BaseException:
+            gemini_breaker.release()
+            raise
+        
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self.model.count_tokens_async(text), timeout=timeout)
+            tokens = response.total_tokens
+        except asyncio.CancelledError:
+            gemini_breaker.release()
+            raise
+        except Exception as e:
+            gemini_breaker.record_failure()
+            logger.warning(f"Gemini token count failed: {e!r}")
+            return None
+        gemini_breaker.record_success(time.monotonic() - start)
+        return tokens
 
-    async def analyze_with_gemini(self, prompt: str) -> str:
+    async def condensed_transcript(self, transcript: str, deadline: Optional[Deadline] = None) -> str:
+        """The transcript condensed to settings.transcript_token_budget tokens.
+
+        Computed once per transcript and shared by every prompt built from it,
+        including prompts running concurrently. The shared computation does not
+        depend on any one request's deadline; a request that cannot wait for
+        it gets a condensation sized by estimate alone, and the shared one
+        still completes for later requests.
+        """
+        key = hashlib.sha1(f"{settings.transcript_token_budget}:{transcript}".encode()).hexdigest()
+        task = _condensed_transcripts.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = asyncio.ensure_future(transcript_compressor.compress(
+                transcript, settings.transcript_token_budget, self.count_tokens
+            ))
+            _condensed_transcripts[key] = task
+            while len(_condensed_transcripts) > CONDENSED_CACHE_SIZE:
+                _condensed_transcripts.popitem(last=False)
+        else:
+            _condensed_transcripts.move_to_end(key)
+        if deadline is None or task.done():
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.timeout(settings.token_count_timeout))
+        except asyncio.TimeoutError:
+            return await asyncio.to_thread(
+                transcript_compressor.estimate, transcript, settings.transcript_token_budget
+            )
+
+    @staticmethod
+    def _degrade(deadline: Optional[Deadline], stage: str) -> None:
+        if deadline:
+            deadline.degrade(stage)
+
+    async def analyze_with_gemini(self, prompt: str, deadline: Optional[Deadline] = None,
+                                  stage: str = "gemini") -> str:
         """Analyze content using Google Gemini"""
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            return response.text
+            return await self._generate(prompt, deadline)
+        except CircuitOpenError:
+            logger.info(f"Gemini circuit open, skipping {stage}")
+        except asyncio.TimeoutError:
+            logger.warning(f"Gemini call for {stage} timed out")
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
-            return "Analysis unavailable"
+        
+        self._degrade(deadline, stage)
+        return "Analysis unavailable"
 
-    async def generate_summary(self, transcript: str, description: str) -> str:
+    async def generate_summary(self, transcript: str, description: str,
+                               deadline: Optional[Deadline] = None) -> str:
         """Generate video summary using Gemini"""
-        content = f"Video Description: {description}\n\nTranscript: {transcript[:settings.max_transcript_length]}"
+        content = f"Video Description: {description}\n\nTranscript: {await self.condensed_transcript(transcript, deadline)}"
         prompt = f"""
         You are Yotube video summarizer. You will be taking the transcript text
         and summarizing the entire video and providing the important summary in points
         within 250 words. Please provide the summary of the text given here:
 
-        {transcript}
+        {content}
         """
         
-        return await self.analyze_with_gemini(prompt)
+        return await self.analyze_with_gemini(prompt, deadline, stage="summary")
 
-    async def extract_topics(self, transcript: str, description: str) -> List[TopicAnalysis]:
-        """Extract topics using Gemini AI"""
-        content = f"Description: {description}\n\nTranscript: {transcript[:settings.max_transcript_length]}"
+    async def extract_topics(self, transcript: str, description: str,
+                             deadline: Optional[Deadline] = None) -> List[TopicAnalysis]:
+        """Extract topics using Gemini AI, falling back to the local topic extractor"""
+        content = f"Description: {description}\n\nTranscript: {await self.condensed_transcript(transcript, deadline)}"
         prompt = f"""
         Analyze this YouTube video content and identify the main topics discussed.
         
@@ -59,7 +197,7 @@ class GeminiService:
         """
         
         try:
-            response = await self.analyze_with_gemini(prompt)
+            response = await self.analyze_with_gemini(prompt, deadline, stage="topics")
             # Try to extract JSON from response
             json_match = re.search(r'\[.*\]', response, re.DOTALL)
             if json_match:
@@ -68,22 +206,23 @@ class GeminiService:
         except Exception as e:
             logger.error(f"Error extracting topics: {e}")
         
-        # Fallback to empty list
-        return []
+        self._degrade(deadline, "topics")
+        return await asyncio.to_thread(topic_extractor.extract, transcript, description)
 
-    async def detect_emotion_with_gemini(self, text: str) -> str:
-        """Detect emotion using Gemini AI"""
+    async def detect_emotion_with_gemini(self, text: str, deadline: Optional[Deadline] = None,
+                                         stage: str = "emotion", max_chars: Optional[int] = 500) -> str:
+        """Detect emotion using Gemini AI, falling back to the local classifier"""
         try:
             prompt = f"""
             Analyze the emotion in this text and return only one word from: joy, sadness, anger, fear, surprise, disgust, neutral.
             
-            Text: "{text[:500]}"
+            Text: "{text[:max_chars]}"
             
             Return only the emotion word, nothing else.
             """
             
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            emotion = response.text.strip().lower()
+            response = await self._generate(prompt, deadline)
+            emotion = response.strip().lower()
             
             # Map to standard emotions
             emotion_map = {
@@ -97,22 +236,28 @@ class GeminiService:
             }
             
             return emotion_map.get(emotion, 'Neutral')
-        except:
-            return 'Neutral'
+        except Exception as e:
+            logger.warning(f"Gemini emotion detection failed: {e!r}")
+            self._degrade(deadline, stage)
+            return emotion_classifier.classify(text)
 
-    async def extract_keywords_advanced(self, text: str, num_keywords: int = 10) -> List[str]:
+    async def extract_keywords_advanced(self, text: str, num_keywords: int = 10,
+                                        deadline: Optional[Deadline] = None,
+                                        stage: str = "keywords", max_chars: Optional[int] = 2000) -> List[str]:
         """Extract keywords using Gemini AI"""
         try:
             prompt = f"""
             Extract the {num_keywords} most important keywords from this text. 
             Return only the keywords separated by commas, no additional text.
             
-            Text: "{text[:2000]}"
+            Text: "{text[:max_chars]}"
             """
             
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            gemini_keywords = [kw.strip() for kw in response.text.split(',')]
+            response = await self._generate(prompt, deadline)
+            gemini_keywords = [kw.strip() for kw in response.split(',')]
             
             return gemini_keywords[:num_keywords]
-        except:
+        except Exception as e:
+            logger.warning(f"Gemini keyword extraction failed: {e!r}")
+            self._degrade(deadline, stage)
             return []
\ No newline at end of file
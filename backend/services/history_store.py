@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from models.schemas import AnalysisResponse, ChannelTrendPoint, VideoSnapshot
+from core.config import settings
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        channel_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        captured_at REAL NOT NULL,
+        published_at TEXT NOT NULL,
+        view_count INTEGER NOT NULL,
+        like_count INTEGER NOT NULL,
+        comment_count INTEGER NOT NULL,
+        positive REAL,
+        neutral REAL,
+        negative REAL,
+        avg_sentiment REAL,
+        engagement_rate REAL,
+        quality_score REAL,
+        comments_analyzed INTEGER NOT NULL,
+        degraded INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS snapshots_video ON snapshots (video_id, captured_at)",
+    # Covers channel trend queries, so they never read the table itself
+    """CREATE INDEX IF NOT EXISTS snapshots_channel ON snapshots (
+        channel_id, captured_at, video_id, view_count, like_count, comment_count, avg_sentiment
+    )""",
+]
+
+# strftime formats that truncate a timestamp to the start of its bucket
+INTERVALS = {
+    "hour": "%Y-%m-%dT%H:00:00Z",
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+class HistoryStore:
+    """Timestamped snapshots of every analysis, for trend queries.
+
+    Each analysis stores the video's raw view, like and comment counts and
+    its sentiment aggregates in SQLite (WAL mode). Snapshots are indexed by
+    (video, time) and (channel, time), so range queries for one video or one
+    channel read only the matching index range.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.history_store_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record(self, video_id: str, response: AnalysisResponse, captured_at: Optional[float] = None) -> None:
+        info = response.video_info
+        shares = {item.name.lower(): item.value for item in response.sentiment_distribution}
+        detail = response.comment_analysis
+        self._connection().execute(
+            "INSERT INTO snapshots (video_id, channel_id, title, captured_at, published_at, view_count, "
+            "like_count, comment_count, positive, neutral, negative, avg_sentiment, engagement_rate, "
+            "quality_score, comments_analyzed, degraded) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                video_id, info.channel_id, info.title, captured_at or time.time(), info.published_at,
+                info.view_count, info.likes, info.comments,
+                shares.get("positive"), shares.get("neutral"), shares.get("negative"),
+                detail.avg_sentiment if shares else None, detail.engagement_rate, detail.quality_score,
+                detail.total_comments, int(bool(response.degraded_stages))
+            )
+        )
+
+    def video_trend(self, video_id: str, since: Optional[float] = None, until: Optional[float] = None,
+                    limit: int = 500) -> List[VideoSnapshot]:
+        """Snapshots of one video in a time range, oldest first"""
+        rows = self._connection().execute(
+            "SELECT captured_at, view_count, like_count, comment_count, positive, neutral, negative, "
+            "avg_sentiment, engagement_rate, quality_score, comments_analyzed, degraded FROM snapshots "
+            "WHERE video_id = ? AND captured_at >= ? AND captured_at < ? ORDER BY captured_at LIMIT ?",
+            (video_id, since or 0, until or float("inf"), limit)
+        ).fetchall()
+        return [
+            VideoSnapshot(
+                captured_at=_iso(row[0]), view_count=row[1], like_count=row[2], comment_count=row[3],
+                positive=row[4], neutral=row[5], negative=row[6], avg_sentiment=row[7],
+                engagement_rate=row[8], quality_score=row[9], comments_analyzed=row[10], degraded=bool(row[11])
+            )
+            for row in rows
+        ]
+
+    def video_title(self, video_id: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT title FROM snapshots WHERE video_id = ? ORDER BY captured_at DESC LIMIT 1", (video_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def channel_trend(self, channel_id: str, since: Optional[float] = None, until: Optional[float] = None,
+                      interval: str = "day") -> List[ChannelTrendPoint]:
+        """Per-interval totals over a channel's videos, using each video's last snapshot in the interval"""
+        # With MAX(), SQLite takes the other bare columns from the row holding the maximum
+        rows = self._connection().execute(
+            "SELECT period, COUNT(*), SUM(view_count), SUM(like_count), SUM(comment_count), AVG(avg_sentiment) "
+            "FROM (SELECT strftime(?, captured_at, 'unixepoch') AS period, MAX(captured_at), view_count, "
+            "like_count, comment_count, avg_sentiment FROM snapshots "
+            "WHERE channel_id = ? AND captured_at >= ? AND captured_at < ? GROUP BY video_id, period) "
+            "GROUP BY period ORDER BY period",
+            (INTERVALS[interval], channel_id, since or 0, until or float("inf"))
+        ).fetchall()
+        return [
+            ChannelTrendPoint(
+                period=row[0], videos=row[1], view_count=row[2], like_count=row[3], comment_count=row[4],
+                avg_sentiment=round(row[5], 3) if row[5] is not None else None
+            )
+            for row in rows
+        ]
+
+history_store = HistoryStore()
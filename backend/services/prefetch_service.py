@@ -0,0 +1,158 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.youtube_service import YouTubeService
+from services.gemini_service import GeminiService
+from services.analysis_cache import AnalysisCache
+from services.analysis_planner import AnalysisPlan
+from services.utils import parse_channel_ref
+from core.config import settings
+from core.shared_store import SharedStore, shared_store
+from core.logger import logger
+
+WATCHLIST_KEY = "prefetch:watchlist"
+LEADER_KEY = "prefetch:leader"
+
+class PrefetchScheduler:
+    """Keeps analyses of watched videos and channels warm in the shared cache.
+
+    Every prefetch_interval seconds the scheduler lists the watched videos and
+    the latest uploads of watched channels, and recomputes those whose cached
+    analysis is missing or expires within prefetch_refresh_ahead. Only one
+    worker, the holder of a shared leader lease, runs cycles. Refreshes run
+    with prefetch_concurrency and stop once usage passes the share of the
+    daily YouTube and Gemini quotas that is reserved for interactive traffic.
+    """
+
+    def __init__(self, youtube_service: YouTubeService, gemini_service: GeminiService, cache: AnalysisCache,
+                 plan: AnalysisPlan, compute: Callable[[str, AnalysisPlan], Awaitable[dict]],
+                 ttl_for: Optional[Callable[[Any], Optional[float]]] = None,
+                 store: SharedStore = shared_store):
+        self.youtube_service = youtube_service
+        self.gemini_service = gemini_service
+        self.cache = cache
+        self.plan = plan
+        self.compute = compute
+        self.ttl_for = ttl_for
+        self.store = store
+        self._uploads_playlists: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # Watchlist, shared by all workers
+
+    # These do SharedStore I/O; async callers run them with asyncio.to_thread
+
+    @staticmethod
+    def _default_watchlist() -> Dict[str, List[str]]:
+        return {"videos": list(settings.watchlist_videos), "channels": list(settings.watchlist_channels)}
+
+    def watchlist(self) -> Dict[str, List[str]]:
+        return self.store.get(WATCHLIST_KEY) or self._default_watchlist()
+
+    def update_watchlist(self, videos: List[str], channels: List[str], remove: bool = False) -> Dict[str, List[str]]:
+        """Add or remove entries in one transaction, so concurrent updates from any worker are kept"""
+        def update(watchlist: Optional[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+            watchlist = watchlist or self._default_watchlist()
+            for field, items in (("videos", videos), ("channels", channels)):
+                if remove:
+                    watchlist[field] = [item for item in watchlist[field] if item not in items]
+                else:
+                    watchlist[field] += [item for item in dict.fromkeys(items) if item not in watchlist[field]]
+            return watchlist
+
+        return self.store.update(WATCHLIST_KEY, update)
+
+    # Scheduling
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+            logger.info(f"Prefetch scheduler started in worker {os.getpid()}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _lead(self) -> bool:
+        """Take or keep the leader lease so only one worker prefetches"""
+        ttl = settings.prefetch_interval * 2
+        return self.store.renew_lease(LEADER_KEY, ttl) or self.store.acquire_lease(LEADER_KEY, ttl)
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Prefetch cycle failed: {e}")
+            await asyncio.sleep(settings.prefetch_interval)
+
+    def _has_headroom(self) -> bool:
+        """False once prefetching would eat into the quota reserved for interactive use"""
+        share = 1 - settings.prefetch_quota_reserve
+        for quota in (self.youtube_service.quota, self.gemini_service.quota):
+            if quota.daily_limit and quota.used() >= quota.daily_limit * share:
+                return False
+        return True
+
+    async def _channel_videos(self, ref: str) -> List[str]:
+        playlist_id = self._uploads_playlists.get(ref)
+        if playlist_id is None:
+            kind, value = parse_channel_ref(ref)
+            channel = await self.youtube_service.resolve_channel(kind, value)
+            playlist_id = self._uploads_playlists[ref] = channel["uploads_playlist_id"]
+        videos = await self.youtube_service.get_playlist_videos(playlist_id, settings.prefetch_channel_videos)
+        return [video["video_id"] for video in videos]
+
+    async def _due_videos(self) -> List[str]:
+        watchlist = await asyncio.to_thread(self.watchlist)
+        video_ids = list(watchlist["videos"])
+        for ref in watchlist["channels"]:
+            if not await asyncio.to_thread(self._has_headroom):
+                break
+            try:
+                video_ids += await self._channel_videos(ref)
+            except Exception as e:
+                logger.error(f"Prefetch could not list uploads of {ref}: {e}")
+        video_ids = list(dict.fromkeys(video_ids))
+        due = await asyncio.to_thread(lambda: [
+            self.cache.refresh_due(self.plan.cache_key(video_id), settings.prefetch_refresh_ahead)
+            for video_id in video_ids
+        ])
+        return [video_id for video_id, is_due in zip(video_ids, due) if is_due]
+
+    async def run_once(self) -> int:
+        """Refresh every due video once if this worker leads; returns the number refreshed"""
+        if not await asyncio.to_thread(self._lead):
+            return 0
+        if not await asyncio.to_thread(self._has_headroom):
+            logger.info("Prefetch skipped: quota reserved for interactive requests")
+            return 0
+
+        semaphore = asyncio.Semaphore(settings.prefetch_concurrency)
+        refreshed = 0
+
+        async def refresh(video_id: str) -> None:
+            nonlocal refreshed
+            async with semaphore:
+                if not await asyncio.to_thread(self._has_headroom) or not await asyncio.to_thread(self._lead):
+                    return
+                key = self.plan.cache_key(video_id)
+                try:
+                    await self.cache.refresh(
+                        key, lambda: self.compute(video_id, self.plan), self.ttl_for,
+                        ahead=settings.prefetch_refresh_ahead
+                    )
+                    refreshed += 1
+                except Exception as e:
+                    logger.error(f"Prefetch of {video_id} failed: {e}")
+
+        await asyncio.gather(*(refresh(video_id) for video_id in await self._due_videos()))
+        if refreshed:
+            logger.info(f"Prefetched {refreshed} analyses")
+        return refreshed
@@ -1,5 +1,5 @@
 import asyncio
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from collections import Counter
 
 import nltk
@@ -14,9 +14,13 @@ from models.schemas import (
     VideoAnalysisDetail
 )
 from services.gemini_service import GeminiService
-from services.utils import clean_text, extract_keywords
+from services.emotion_service import emotion_classifier
+from services.utils import extract_keywords
+from services.text_normalizer import normalized_for, top_lemmas
+from services.comment_sampler import representative_sample
 from core.config import settings
 from core.logger import logger
+from core.deadline import Deadline
 
 # Download required NLTK data
 try:
@@ -24,6 +28,7 @@ try:
     nltk.download('stopwords', quiet=True)
     nltk.download('wordnet', quiet=True)
     nltk.download('vader_lexicon', quiet=True)
+    nltk.download('averaged_perceptron_tagger', quiet=True)
 except:
     pass
 
@@ -41,66 +46,177 @@ class SentimentService:
         
         self.gemini_service = GeminiService()
 
+    def score_components(self, text: str) -> Tuple[float, Optional[float]]:
+        """TextBlob polarity and VADER compound score (None when VADER is unavailable)"""
+        polarity = TextBlob(text).sentiment.polarity
+        compound = self.sia.polarity_scores(text)['compound'] if self.sia else None
+        return polarity, compound
+
+    @staticmethod
+    def combine_scores(polarity: float, compound: Optional[float]) -> Tuple[str, float]:
+        """Combine TextBlob and VADER scores into a label and score"""
+        combined_score = (polarity + compound) / 2 if compound is not None else polarity
+        
+        if combined_score > settings.sentiment_threshold_positive:
+            return "POSITIVE", combined_score
+        elif combined_score < settings.sentiment_threshold_negative:
+            return "NEGATIVE", combined_score
+        else:
+            return "NEUTRAL", combined_score
+
     def analyze_sentiment_advanced(self, text: str) -> Tuple[str, float]:
         """Advanced sentiment analysis using multiple methods"""
         try:
-            # TextBlob sentiment
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            
-            # VADER sentiment for comparison
-            if self.sia:
-                vader_scores = self.sia.polarity_scores(text)
-                compound = vader_scores['compound']
-                
-                # Combine both approaches for better accuracy
-                combined_score = (polarity + compound) / 2
-            else:
-                combined_score = polarity
-            
-            if combined_score > settings.sentiment_threshold_positive:
-                return "POSITIVE", combined_score
-            elif combined_score < settings.sentiment_threshold_negative:
-                return "NEGATIVE", combined_score
-            else:
-                return "NEUTRAL", combined_score
+            return self.combine_scores(*self.score_components(text))
         except:
             return "NEUTRAL", 0.0
 
-    async def analyze_comments_comprehensive(self, comments: List[CommentData]) -> Dict[str, Any]:
+    @staticmethod
+    def is_ambiguous(polarity: Optional[float], compound: Optional[float]) -> bool:
+        """Whether local scores are too uncertain to trust without escalation.
+
+        A comment is ambiguous when its combined score lies within
+        settings.escalation_margin of either sentiment threshold, or when
+        TextBlob and VADER point in opposite directions and differ by at least
+        settings.escalation_disagreement.
+        """
+        if polarity is None:
+            return True
+        if compound is None:
+            combined = polarity
+        else:
+            combined = (polarity + compound) / 2
+            if polarity * compound < 0 and abs(polarity - compound) >= settings.escalation_disagreement:
+                return True
+        
+        margin = settings.escalation_margin
+        return (abs(combined - settings.sentiment_threshold_positive) <= margin
+                or abs(combined - settings.sentiment_threshold_negative) <= margin)
+
+    @staticmethod
+    def local_emotion(comment: CommentData) -> str:
+        """Emotion label for a comment from the offline lexicon classifier"""
+        return emotion_classifier.classify_normalized(normalized_for(comment))
+
+    def _use_local(self, deadline: Optional[Deadline]) -> bool:
+        """Whether optional Gemini work should run locally instead.
+
+        True while the Gemini circuit breaker is open, or when too little of
+        the request deadline is left.
+        """
+        if not self.gemini_service.is_available():
+            return True
+        return deadline is not None and not deadline.allows(settings.optional_stage_min_budget)
+
+    def _degrade(self, deadline: Optional[Deadline], stage: str) -> None:
+        if deadline:
+            deadline.degrade(stage)
+
+    async def _cascade_emotions(self, comments: List[CommentData], max_escalations: int,
+                                deadline: Optional[Deadline] = None) -> Tuple[Counter, float]:
+        """Label every comment locally, escalating only ambiguous ones to Gemini.
+
+        At most max_escalations comments are sent to Gemini; returns the
+        weighted emotion counts and the fraction of comments escalated.
+        """
+        escalated = []
+        emotion_counts = Counter()
+        for comment in comments:
+            if len(escalated) < max_escalations and self.is_ambiguous(comment.polarity, comment.vader_score):
+                escalated.append(comment)
+            else:
+                emotion_counts[self.local_emotion(comment)] += comment.weight
+        
+        gemini_emotions = await asyncio.gather(
+            *(self.gemini_service.detect_emotion_with_gemini(comment.text, deadline) for comment in escalated)
+        )
+        for comment, emotion in zip(escalated, gemini_emotions):
+            emotion_counts[emotion] += comment.weight
+        
+        return emotion_counts, len(escalated) / len(comments)
+
+    async def analyze_comments_comprehensive(self, comments: List[CommentData], emotion_sample_size: int = 20,
+                                             include_keywords: bool = True,
+                                             deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Comprehensive comment analysis using original logic with Gemini enhancement"""
         if not comments:
             return {
                 "sentiment_distribution_detailed": {"POSITIVE": 0, "NEGATIVE": 0, "NEUTRAL": 0},
                 "emotion_distribution": {"Neutral": 1},
+                "emotion_escalation_rate": None,
                 "top_keywords": []
             }
         
-        # Collect all comment text for analysis
-        all_text = " ".join([clean_text(comment.text) for comment in comments])
-        
-        # Sentiment distribution
-        sentiment_counts = Counter(comment.sentiment.upper() for comment in comments)
+        # Sentiment distribution, weighted by duplicate multiplicity
+        sentiment_counts = Counter()
+        for comment in comments:
+            sentiment_counts[comment.sentiment.upper()] += comment.weight
         
-        # Extract emotions using Gemini AI
-        emotions = []
-        for comment in comments[:20]:  # Analyze first 20 comments for emotions
-            emotion = await self.gemini_service.detect_emotion_with_gemini(comment.text)
-            emotions.append(emotion)
+        # Extract emotions using Gemini AI, locally for every comment, or
+        # locally with escalation of ambiguous comments in cascade mode.
+        # Falls back to local classification when the deadline is short.
+        emotion_mode = settings.emotion_mode
+        if emotion_sample_size > 0 and emotion_mode != "local" and self._use_local(deadline):
+            self._degrade(deadline, "emotion")
+            emotion_mode = "local"
         
-        emotion_counts = dict(Counter(emotions))
+        escalation_rate = None
+        if emotion_mode == "local" and emotion_sample_size > 0:
+            emotion_counts = Counter()
+            for comment in comments:
+                emotion_counts[self.local_emotion(comment)] += comment.weight
+        elif emotion_mode == "cascade" and emotion_sample_size > 0:
+            emotion_counts, escalation_rate = await self._cascade_emotions(comments, emotion_sample_size, deadline)
+        else:
+            emotion_counts = Counter()
+            # Analyze a representative sample of unique comments for emotions
+            sample = representative_sample(comments, emotion_sample_size)
+            emotions = await asyncio.gather(
+                *(self.gemini_service.detect_emotion_with_gemini(comment.text, deadline) for comment in sample)
+            )
+            for comment, emotion in zip(sample, emotions):
+                emotion_counts[emotion] += comment.weight
         
         # Extract keywords
-        keywords = await self.gemini_service.extract_keywords_advanced(all_text, settings.default_keywords_count)
-        if not keywords:
-            keywords = extract_keywords(all_text, settings.default_keywords_count)
+        keywords = []
+        if include_keywords:
+            artifacts = [normalized_for(comment) for comment in comments]
+            if self._use_local(deadline):
+                self._degrade(deadline, "comment_keywords")
+            else:
+                # A budgeted, representative sample rather than the first characters of all comments
+                sample = representative_sample(
+                    comments, settings.comment_sample_size,
+                    max_chars=settings.comment_sample_max_chars, text_chars=settings.comment_sample_text_chars
+                )
+                sample_text = "\n".join(
+                    normalized_for(comment).cleaned[:settings.comment_sample_text_chars] for comment in sample
+                )
+                keywords = await self.gemini_service.extract_keywords_advanced(
+                    sample_text, settings.default_keywords_count, deadline,
+                    stage="comment_keywords", max_chars=None
+                )
+            if not keywords:
+                keywords = top_lemmas(
+                    (artifact.lemmas for artifact in artifacts), settings.default_keywords_count,
+                    weights=[comment.weight for comment in comments]
+                )
         
         return {
             "sentiment_distribution_detailed": dict(sentiment_counts),
-            "emotion_distribution": emotion_counts,
+            "emotion_distribution": dict(emotion_counts),
+            "emotion_escalation_rate": escalation_rate,
             "top_keywords": keywords
         }
 
+    @staticmethod
+    def _weighted_sentiment_counts(comments: List[CommentData]) -> Counter:
+        """Count sentiment labels, counting each comment group by its multiplicity"""
+        counts = Counter()
+        for comment in comments:
+            counts[comment.sentiment] += comment.weight
+        return counts
+
     def calculate_sentiment_distribution(self, comments: List[CommentData]) -> List[SentimentDistribution]:
         """Calculate sentiment distribution from comments"""
         if not comments:
@@ -110,8 +226,12 @@ class SentimentService:
                 SentimentDistribution(name="Negative", value=10.0, color="#ef4444")
             ]
         
-        sentiment_counts = Counter(comment.sentiment for comment in comments)
-        total = len(comments)
+        return self.sentiment_distribution_from_counts(self._weighted_sentiment_counts(comments))
+
+    @staticmethod
+    def sentiment_distribution_from_counts(sentiment_counts: Dict[str, int]) -> List[SentimentDistribution]:
+        """Sentiment distribution from (weighted) counts of lowercase labels"""
+        total = sum(sentiment_counts.values()) or 1
         
         return [
             SentimentDistribution(
@@ -148,8 +268,8 @@ class SentimentService:
             segment_comments = comments[start_idx:end_idx]
             
             if segment_comments:
-                sentiment_counts = Counter(comment.sentiment for comment in segment_comments)
-                total = len(segment_comments)
+                sentiment_counts = self._weighted_sentiment_counts(segment_comments)
+                total = sum(comment.weight for comment in segment_comments)
                 
                 sentiment_over_time.append(SentimentOverTime(
                     time=segment,
@@ -168,16 +288,39 @@ class SentimentService:
         return sentiment_over_time
 
     async def analyze_transcript_comprehensive(self, transcript: str, summary: str = "", 
-                                            comments_count: int = 0, engagement_rate: float = 0.0) -> VideoAnalysisDetail:
+                                            comments_count: int = 0, engagement_rate: float = 0.0,
+                                            include_keywords: bool = True,
+                                            include_emotion: bool = True,
+                                            deadline: Optional[Deadline] = None) -> VideoAnalysisDetail:
         """Comprehensive transcript analysis using original logic enhanced with Gemini"""
         try:
-            # Extract keywords using advanced method
-            keywords = await self.gemini_service.extract_keywords_advanced(transcript, 8)
-            if not keywords:
-                keywords = extract_keywords(transcript, 8)
+            # Extract keywords using advanced method, locally when the deadline is short
+            keywords = []
+            if include_keywords and transcript:
+                if self._use_local(deadline):
+                    self._degrade(deadline, "transcript_keywords")
+                else:
+                    keywords = await self.gemini_service.extract_keywords_advanced(
+                        await self.gemini_service.condensed_transcript(transcript, deadline),
+                        8, deadline, stage="transcript_keywords", max_chars=None
+                    )
+                if not keywords:
+                    keywords = extract_keywords(transcript, 8)
             
-            # Detect emotion using Gemini
-            emotion = await self.gemini_service.detect_emotion_with_gemini(transcript)
+            # Detect emotion using Gemini, or the local classifier in local
+            # mode or when the deadline is short
+            emotion = "Neutral"
+            if include_emotion and transcript:
+                if settings.emotion_mode == "local":
+                    emotion = emotion_classifier.classify(transcript)
+                elif self._use_local(deadline):
+                    self._degrade(deadline, "transcript_emotion")
+                    emotion = emotion_classifier.classify(transcript)
+                else:
+                    emotion = await self.gemini_service.detect_emotion_with_gemini(
+                        await self.gemini_service.condensed_transcript(transcript, deadline),
+                        deadline, stage="transcript_emotion", max_chars=None
+                    )
             
             # Generate quality score using original logic
             quality_score = self.generate_video_quality_score(
@@ -0,0 +1,239 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from models.schemas import SimilarVideo
+from services.text_normalizer import normalize, stop_words
+from core.config import settings
+
+# Relative weight of each source of terms in a video's vector
+TOPIC_WEIGHT = 3.0
+TRANSCRIPT_KEYWORD_WEIGHT = 2.0
+COMMENT_KEYWORD_WEIGHT = 1.0
+TRANSCRIPT_TERM_WEIGHT = 1.0
+MAX_TRANSCRIPT_TERMS = 50
+
+def _content_terms(text: str) -> List[str]:
+    """Lemmas of a text, or filtered lowercase tokens when WordNet is unavailable"""
+    normalized = normalize(text)
+    if normalized.lemmas:
+        return normalized.lemmas
+    return [
+        token for token in (token.lower() for token in normalized.tokens)
+        if token.isalpha() and len(token) > 2 and token not in stop_words
+    ]
+
+def video_term_sources(topics: List[str], transcript_keywords: List[str], comment_keywords: List[str],
+                       transcript: str) -> Dict[str, Dict[str, float]]:
+    """Weighted term frequencies for a video, by the analysis output they come from.
+
+    Outputs that are empty (not produced by the analysis) are left out.
+    """
+    sources = {}
+    for source, phrases, weight in (("topics", topics, TOPIC_WEIGHT),
+                                    ("transcript_keywords", transcript_keywords, TRANSCRIPT_KEYWORD_WEIGHT),
+                                    ("comment_keywords", comment_keywords, COMMENT_KEYWORD_WEIGHT)):
+        terms = Counter()
+        for phrase in phrases:
+            words = _content_terms(phrase)
+            # Multi-word phrases count as a whole and, more weakly, word by word
+            if len(words) > 1:
+                terms[" ".join(words)] += weight
+            for word in words:
+                terms[word] += weight / len(words)
+        if terms:
+            sources[source] = dict(terms)
+    terms = Counter()
+    for term, count in Counter(_content_terms(transcript)).most_common(MAX_TRANSCRIPT_TERMS):
+        terms[term] += TRANSCRIPT_TERM_WEIGHT * (1 + math.log(count))
+    if terms:
+        sources["transcript"] = dict(terms)
+    return sources
+
+def combine_sources(sources: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    terms = Counter()
+    for source_terms in sources.values():
+        terms.update(source_terms)
+    return dict(terms)
+
+def video_terms(topics: List[str], transcript_keywords: List[str], comment_keywords: List[str],
+                transcript: str) -> Dict[str, float]:
+    """Weighted term frequencies for a video from its analysis outputs"""
+    return combine_sources(video_term_sources(topics, transcript_keywords, comment_keywords, transcript))
+
+class SimilarityIndex:
+    """TF-IDF similarity over analyzed videos, persisted in SQLite.
+
+    Each video is a sparse vector of weighted terms from its topics,
+    keywords and transcript. Vectors are stored in SQLite and mirrored in an
+    in-memory inverted index, so a query only touches videos that share a
+    term with it. Terms are also kept by source, so an analysis that
+    produced only some outputs (a lighter plan) updates just those and
+    keeps the rest of the stored vector. Every write bumps a sequence number; before each query a
+    worker loads just the rows written since its last sync, so indexes in
+    all workers stay current without rebuilds.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.similarity_index_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._doc_seqs: Dict[str, int] = {}
+        self._docs: Dict[str, Dict[str, float]] = {}
+        self._titles: Dict[str, str] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._df = Counter()
+        self._norms: Dict[str, float] = {}
+        self._norms_doc_count = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "video_id TEXT PRIMARY KEY, title TEXT NOT NULL, terms TEXT NOT NULL, "
+                "seq INTEGER NOT NULL, updated_at REAL NOT NULL, sources TEXT)"
+            )
+            try:
+                conn.execute("ALTER TABLE videos ADD COLUMN sources TEXT")
+            except sqlite3.OperationalError:
+                pass  # Already present
+            conn.execute("CREATE INDEX IF NOT EXISTS videos_seq ON videos (seq)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, video_id: str, title: str, terms: Dict[str, float]) -> None:
+        """Insert or replace a video's vector"""
+        if terms:
+            self._write(video_id, title, lambda stored: (terms, None))
+
+    def add_analysis(self, video_id: str, title: str, topics: List[str], transcript_keywords: List[str],
+                     comment_keywords: List[str], transcript: str) -> None:
+        """Index an analysis, merging its outputs into the ones stored for the video"""
+        sources = video_term_sources(topics, transcript_keywords, comment_keywords, transcript)
+        if not sources:
+            return
+
+        def merge(stored: Optional[str]):
+            merged = {**json.loads(stored), **sources} if stored else sources
+            return combine_sources(merged), merged
+
+        self._write(video_id, title, merge)
+
+    def _write(self, video_id: str, title: str, vector_for) -> None:
+        """Store the (terms, sources) vector_for returns given the stored sources"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT sources FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            terms, sources = vector_for(row[0] if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, title, terms, seq, updated_at, sources) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM videos), ?, ?)",
+                (video_id, title, json.dumps(terms), time.time(), json.dumps(sources) if sources else None)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._sync()
+
+    def _sync(self) -> None:
+        """Apply rows written (by any worker) since the last sync.
+
+        Reads under the lock, so concurrent syncs cannot apply an older row
+        for a video after a newer one.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT video_id, title, terms, seq FROM videos WHERE seq > ? ORDER BY seq", (self._seq,)
+            ).fetchall()
+            for video_id, title, terms, seq in rows:
+                if seq <= self._doc_seqs.get(video_id, 0):
+                    continue
+                self._doc_seqs[video_id] = seq
+                self._remove(video_id)
+                terms = json.loads(terms)
+                self._docs[video_id] = terms
+                self._titles[video_id] = title
+                for term, weight in terms.items():
+                    self._postings[term][video_id] = weight
+                self._df.update(terms.keys())
+                self._seq = max(self._seq, seq)
+
+    def _remove(self, video_id: str) -> None:
+        terms = self._docs.pop(video_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            self._postings[term].pop(video_id, None)
+            self._df[term] -= 1
+            if not self._postings[term]:
+                del self._postings[term]
+                del self._df[term]
+        self._norms.pop(video_id, None)
+
+    def _idf(self, term: str) -> float:
+        return math.log((len(self._docs) + 1) / (self._df.get(term, 0) + 1)) + 1
+
+    def _norm(self, video_id: str) -> float:
+        # IDF drifts as videos are added; refresh cached norms once the
+        # corpus has grown by a tenth since they were computed
+        if len(self._docs) > self._norms_doc_count * 1.1:
+            self._norms = {}
+            self._norms_doc_count = len(self._docs)
+        norm = self._norms.get(video_id)
+        if norm is None:
+            norm = math.sqrt(sum((weight * self._idf(term)) ** 2 for term, weight in self._docs[video_id].items()))
+            self._norms[video_id] = norm
+        return norm
+
+    def __contains__(self, video_id: str) -> bool:
+        self._sync()
+        return video_id in self._docs
+
+    def similar(self, video_id: str, limit: int = 10) -> List[SimilarVideo]:
+        """Most similar indexed videos by cosine similarity of TF-IDF vectors"""
+        self._sync()
+        with self._lock:
+            query = self._docs.get(video_id)
+            if not query:
+                return []
+            query_norm = self._norm(video_id)
+
+            scores = defaultdict(float)
+            shared = defaultdict(list)
+            for term, weight in query.items():
+                idf_squared = self._idf(term) ** 2
+                for other, other_weight in self._postings.get(term, {}).items():
+                    if other != video_id:
+                        scores[other] += weight * other_weight * idf_squared
+                        shared[other].append(term)
+
+            ranked = sorted(
+                ((score / (query_norm * self._norm(other)), other) for other, score in scores.items()),
+                reverse=True
+            )[:limit]
+            return [
+                SimilarVideo(
+                    video_id=other,
+                    title=self._titles[other],
+                    score=round(score, 4),
+                    shared_terms=sorted(shared[other], key=lambda term: -query[term] * self._idf(term))[:5]
+                )
+                for score, other in ranked
+            ]
+
+similarity_index = SimilarityIndex()
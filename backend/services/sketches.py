@@ -0,0 +1,177 @@
+"""Fixed-memory streaming summaries for very large comment volumes.
+
+Every structure here uses memory set by its parameters alone, however
+many items it sees. Error bounds, with N the total weight added:
+
+- CountMinSketch(width w, depth d): estimate(x) >= true(x), and
+  estimate(x) <= true(x) + (e / w) * N with probability >= 1 - e^-d.
+  With the defaults (w=2048, d=4) that is +0.13% of N with 98% certainty.
+- HeavyHitters(k): keeps the k items with the highest Count-Min estimates.
+  Every item whose true count exceeds (e / w) * N + the k-th largest
+  estimate is reported. Reported counts carry the Count-Min error.
+- HyperLogLog(p): distinct count with relative standard error
+  1.04 / sqrt(2^p). The default p=12 gives about 1.6% using 4 KiB.
+- ReservoirSample(k): a uniform sample of k items (Algorithm R), where
+  every item seen has probability k / n of being kept.
+- TopK(k): the exact k largest items by key, via a bounded min-heap.
+- StreamingStats: exact count, mean, variance, min and max (Welford).
+  Quantiles come from a fixed-bin histogram over [low, high], and are
+  within one bin width ((high - low) / bins) of the exact value.
+
+Hashes use Python's per-process randomized hash(), so sketches must not be
+merged across processes.
+"""
+import heapq
+import math
+import random
+from array import array
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array("q", [0]) * width for _ in range(depth)]
+        self._seeds = [random.Random(seed + row).getrandbits(61) for row in range(depth)]
+
+    def _indexes(self, item: Hashable) -> List[int]:
+        return [hash((seed, item)) % self.width for seed in self._seeds]
+
+    def add(self, item: Hashable, count: int = 1) -> int:
+        """Add count for item and return its new estimate"""
+        self.total += count
+        estimate = None
+        for row, index in zip(self._rows, self._indexes(item)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, item: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(item)))
+
+class HeavyHitters:
+    """Top-k frequent items from Count-Min estimates, holding k candidates"""
+
+    def __init__(self, k: int = 100, width: int = 2048, depth: int = 4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self._candidates: Dict[Hashable, int] = {}
+        self._floor = 0
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        estimate = self.sketch.add(item, count)
+        if item in self._candidates or len(self._candidates) < self.k:
+            self._candidates[item] = estimate
+        elif estimate > self._floor:
+            # Candidate estimates only grow, so the cached floor stays a lower
+            # bound on the weakest one and rescans are needed only above it
+            weakest = min(self._candidates, key=self._candidates.get)
+            if estimate > self._candidates[weakest]:
+                del self._candidates[weakest]
+                self._candidates[item] = estimate
+            self._floor = min(self._candidates.values())
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        return sorted(self._candidates.items(), key=lambda pair: pair[1], reverse=True)[:n or self.k]
+
+class HyperLogLog:
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self._registers = bytearray(self.m)
+        self._alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, item: Hashable) -> None:
+        hashed = hash(item) & 0xFFFFFFFFFFFFFFFF
+        index = hashed >> (64 - self.p)
+        remainder = (hashed << self.p) & 0xFFFFFFFFFFFFFFFF
+        rank = 64 - self.p + 1 if remainder == 0 else 65 - remainder.bit_length()
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        estimate = self._alpha * self.m * self.m / sum(2.0 ** -register for register in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+class ReservoirSample(Generic[T]):
+    def __init__(self, k: int, seed: Optional[int] = None):
+        self.k = k
+        self.seen = 0
+        self.items: List[T] = []
+        self._random = random.Random(seed)
+
+    def add(self, item: T) -> None:
+        self.seen += 1
+        if len(self.items) < self.k:
+            self.items.append(item)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.k:
+                self.items[slot] = item
+
+class TopK(Generic[T]):
+    def __init__(self, k: int, key: Callable[[T], Any]):
+        self.k = k
+        self.key = key
+        self._heap: List[Tuple[Any, int, T]] = []
+        self._counter = 0
+
+    def add(self, item: T) -> None:
+        entry = (self.key(item), self._counter, item)
+        self._counter += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[T]:
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: (entry[0], -entry[1]), reverse=True)]
+
+class StreamingStats:
+    def __init__(self, low: float = -1.0, high: float = 1.0, bins: int = 200):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._histogram = array("q", [0]) * bins
+
+    def add(self, value: float, weight: int = 1) -> None:
+        # Weighted Welford update
+        self.count += weight
+        delta = value - self.mean
+        self.mean += delta * weight / self.count
+        self._m2 += weight * delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        position = int((value - self.low) / (self.high - self.low) * self.bins)
+        self._histogram[min(max(position, 0), self.bins - 1)] += weight
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        width = (self.high - self.low) / self.bins
+        for index, weight in enumerate(self._histogram):
+            if weight and cumulative + weight >= target:
+                # Interpolate within the bin
+                fraction = (target - cumulative) / weight
+                value = self.low + (index + fraction) * width
+                return min(max(value, self.min), self.max)
+            cumulative += weight
+        return self.max
@@ -0,0 +1,84 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
+from collections import Counter
+
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+from models.schemas import CommentData, NormalizedText
+from core.logger import logger
+
+# Initialize NLTK components
+try:
+    stop_words = set(stopwords.words('english'))
+    lemmatizer = WordNetLemmatizer()
+except:
+    stop_words = set()
+    lemmatizer = None
+
+_URL_PATTERN = re.compile(r"http\S+")
+_MENTION_PATTERN = re.compile(r"[@#]\w+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+# Words, contractions and single emoji (pictographs with optional variation selector)
+TOKEN_PATTERN = re.compile(r"[^\W\d_][^\W\d_'\-]*(?:['\-][^\W\d_]+)*|[☀-➿\U0001F300-\U0001FAFF]️?")
+
+def strip_text(text: str) -> str:
+    """Text without URLs and mentions, case and spacing kept"""
+    return _MENTION_PATTERN.sub("", _URL_PATTERN.sub("", text))
+
+def clean_text(text: str) -> str:
+    """Clean text by removing URLs, mentions, and extra whitespace"""
+    return _WHITESPACE_PATTERN.sub(" ", strip_text(text)).strip().lower()
+
+@lru_cache(maxsize=65536)
+def lemmatize(token: str) -> str:
+    return lemmatizer.lemmatize(token)
+
+def content_lemmas(tokens: Iterable[str]) -> List[str]:
+    """Lemmas of the alphabetic, non-stopword tokens longer than two characters"""
+    global lemmatizer
+    if not lemmatizer:
+        return []
+    try:
+        lemmas = [lemmatize(token.lower()) for token in tokens if token.isalpha()]
+    except LookupError:
+        logger.warning("WordNet data unavailable, keyword lemmas disabled")
+        lemmatizer = None
+        return []
+    return [lemma for lemma in lemmas if lemma not in stop_words and len(lemma) > 2]
+
+def normalize(text: str) -> NormalizedText:
+    """Clean, tokenize and lemmatize a text once for every downstream stage"""
+    return normalize_stripped(strip_text(text))
+
+def normalize_stripped(stripped: str) -> NormalizedText:
+    """normalize() for text that strip_text has already been applied to"""
+    cleaned = _WHITESPACE_PATTERN.sub(" ", stripped).strip().lower()
+    tokens = TOKEN_PATTERN.findall(stripped)
+    
+    return NormalizedText(
+        cleaned=cleaned,
+        tokens=tokens,
+        lemmas=content_lemmas(tokens),
+        exclamations=stripped.count("!")
+    )
+
+def normalized_for(comment: CommentData) -> NormalizedText:
+    """The comment's normalization artifact, computing it if the comment has none"""
+    if comment.normalized is None:
+        comment.normalized = normalize(comment.text)
+    return comment.normalized
+
+def top_lemmas(lemma_lists: Iterable[Sequence[str]], num_keywords: int = 10,
+               weights: Optional[Iterable[int]] = None) -> List[str]:
+    """Most frequent lemmas across several normalized texts"""
+    counts = Counter()
+    if weights is None:
+        for lemmas in lemma_lists:
+            counts.update(lemmas)
+    else:
+        for lemmas, weight in zip(lemma_lists, weights):
+            for lemma in lemmas:
+                counts[lemma] += weight
+    return [word for word, freq in counts.most_common(num_keywords)]
@@ -0,0 +1,220 @@
+import math
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import nltk
+
+from models.schemas import TopicAnalysis
+from services.text_normalizer import TOKEN_PATTERN, stop_words
+from core.config import settings
+from core.logger import logger
+
+# Used with (or instead of, when NLTK data is missing) the NLTK stopwords.
+# Includes the filler words that are common in spoken transcripts.
+_STOP_WORDS = set("""
+    a about above after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing done down during each even ever every few
+    for from further get gets getting got had has have having he her here hers herself him himself
+    his how however i if in into is it its itself just let lets like made make makes making many may
+    me might more most much must my myself no nor not now of off often on once one only or other our
+    ours ourselves out over own really right said same say says see seen she should since so some
+    something still such sure take than that the their theirs them themselves then there these they
+    thing things think this those though through to too under until up upon us use used using very
+    want wants was way we well were what when where whether which while who whom why will with
+    within without would yes yet you your yours yourself yourselves
+    actually again ah alright anyway basically cause definitely gonna gotta guys hey hmm kind kinda
+    know little lot lots maybe mean oh okay ok pretty probably stuff sort uh um wanna yeah yep
+    going go goes went come comes came look looking looks put thank thanks today welcome video
+""".split())
+
+_SEGMENT_SPLIT = re.compile(r"[.!?;:\n]+")
+_MAX_PHRASE_WORDS = 3
+_SEGMENT_WORDS = 30
+_KMEANS_ITERATIONS = 10
+
+Vector = Dict[str, float]
+
+def _key(word: str) -> str:
+    """Crude singularization, so "decorator" and "decorators" count as one term"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def _dot(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+def _normalized(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else vector
+
+class TopicExtractor:
+    """Offline topic extraction from a transcript and description.
+
+    Produces the same TopicAnalysis list as GeminiService.extract_topics.
+    The text is cut into sentences (or 30-word windows, for unpunctuated
+    auto-captions). Candidate phrases are noun phrases (adjectives then
+    nouns) when the NLTK tagger is installed, otherwise runs of content
+    words between stop words; at most three words long, scored as in RAKE. Sentences become TF-IDF
+    vectors and are grouped by spherical k-means; each cluster is named by
+    its best-scoring phrase. Relevance is the cluster's share of the text
+    relative to the largest cluster, and mentions count the phrase's
+    occurrences.
+    """
+
+    def __init__(self, num_topics: Optional[int] = None, seed: int = 0):
+        self.num_topics = num_topics or settings.topic_count
+        self.seed = seed
+        self.stop_words = _STOP_WORDS | stop_words
+        self._tagger_available = True
+
+    def _segments(self, text: str) -> List[List[str]]:
+        """Lowercased word lists of the sentences, with long ones split into windows"""
+        segments = []
+        for sentence in _SEGMENT_SPLIT.split(text):
+            words = [token.lower() for token in TOKEN_PATTERN.findall(sentence) if token.isalpha()]
+            for start in range(0, len(words), _SEGMENT_WORDS):
+                segments.append(words[start:start + _SEGMENT_WORDS])
+        return [segment for segment in segments if segment]
+
+    def _tags(self, words: Sequence[str]) -> Optional[List[str]]:
+        """Part-of-speech tags, or None when the tagger data is not installed"""
+        if not self._tagger_available:
+            return None
+        try:
+            return [tag for _, tag in nltk.pos_tag(list(words))]
+        except LookupError:
+            logger.warning("NLTK tagger data unavailable, topic phrases fall back to stop word splitting")
+            self._tagger_available = False
+            return None
+
+    def _phrases(self, words: Sequence[str]) -> List[Tuple[str, ...]]:
+        """Candidate phrases: noun phrases, or runs of content words between stop words"""
+        tags = self._tags(words) or [None] * len(words)
+        phrases, run = [], []
+        for word, tag in zip(list(words) + [""], tags + [None]):
+            content = word and len(word) > 2 and word not in self.stop_words
+            if content and (tag is None or tag.startswith(("NN", "JJ"))):
+                run.append((word, tag))
+                continue
+            if run and run[0][1] is not None:
+                # A noun phrase ends on a noun; adjectives alone are not topics
+                while run and not run[-1][1].startswith("NN"):
+                    run.pop()
+            for start in range(0, len(run), _MAX_PHRASE_WORDS):
+                phrases.append(tuple(word for word, _ in run[start:start + _MAX_PHRASE_WORDS]))
+            run = []
+        return phrases
+
+    def _kmeans(self, vectors: List[Vector], k: int) -> List[int]:
+        """Spherical k-means with k-means++ seeding; returns a cluster index per vector"""
+        rng = random.Random(self.seed)
+        centroids = [vectors[rng.randrange(len(vectors))]]
+        while len(centroids) < k:
+            distances = [1 - max(_dot(vector, centroid) for centroid in centroids) for vector in vectors]
+            total = sum(distances)
+            if total <= 0:
+                break
+            target, cumulative = rng.random() * total, 0.0
+            for vector, distance in zip(vectors, distances):
+                cumulative += distance
+                if cumulative >= target:
+                    centroids.append(vector)
+                    break
+
+        assignments = [-1] * len(vectors)
+        for _ in range(_KMEANS_ITERATIONS):
+            changed = False
+            for index, vector in enumerate(vectors):
+                best = max(range(len(centroids)), key=lambda c: _dot(vector, centroids[c]))
+                if best != assignments[index]:
+                    assignments[index] = best
+                    changed = True
+            if not changed:
+                break
+            sums = [defaultdict(float) for _ in centroids]
+            for vector, cluster in zip(vectors, assignments):
+                for term, weight in vector.items():
+                    sums[cluster][term] += weight
+            centroids = [_normalized(dict(total)) if total else centroid for total, centroid in zip(sums, centroids)]
+        return assignments
+
+    def extract(self, transcript: str, description: str = "") -> List[TopicAnalysis]:
+        text = f"{description}\n{transcript[:settings.topic_max_chars]}"
+        segments = self._segments(text)
+        raw_phrases = [self._phrases(segment) for segment in segments]
+        segment_phrases = [[tuple(_key(word) for word in phrase) for phrase in phrases] for phrases in raw_phrases]
+
+        # RAKE word scores: degree over frequency within candidate phrases
+        frequency, degree = Counter(), Counter()
+        surface: Dict[Tuple[str, ...], Counter] = defaultdict(Counter)
+        for raws, phrases in zip(raw_phrases, segment_phrases):
+            for phrase, raw in zip(phrases, raws):
+                surface[phrase][" ".join(raw)] += 1
+                for word in phrase:
+                    frequency[word] += 1
+                    degree[word] += len(phrase)
+        if not frequency:
+            return []
+        phrase_counts = Counter(phrase for phrases in segment_phrases for phrase in phrases)
+        phrase_scores = {
+            phrase: sum(degree[word] / frequency[word] for word in phrase) * math.log1p(count)
+            for phrase, count in phrase_counts.items()
+        }
+
+        # TF-IDF vectors over the content words of each segment
+        document_frequency = Counter(word for phrases in segment_phrases for word in {w for p in phrases for w in p})
+        vectors, kept = [], []
+        for index, phrases in enumerate(segment_phrases):
+            counts = Counter(word for phrase in phrases for word in phrase)
+            if counts:
+                vectors.append(_normalized({
+                    word: (1 + math.log(count)) * math.log((1 + len(segments)) / (1 + document_frequency[word])) + 1e-6
+                    for word, count in counts.items()
+                }))
+                kept.append(index)
+
+        k = max(1, min(self.num_topics, int(math.sqrt(len(vectors) / 2))))
+        assignments = self._kmeans(vectors, k) if len(vectors) > 1 else [0] * len(vectors)
+        clusters: Dict[int, Counter] = defaultdict(Counter)
+        sizes = Counter(assignments)
+        for cluster, index in zip(assignments, kept):
+            clusters[cluster].update(segment_phrases[index])
+
+        topics, used = [], set()
+        for cluster, size in sizes.most_common():
+            ranked = sorted(
+                clusters[cluster],
+                key=lambda phrase: phrase_scores[phrase] * clusters[cluster][phrase],
+                reverse=True
+            )
+            for phrase in ranked:
+                # Skip phrases that repeat a word of an already chosen topic
+                if used.isdisjoint(phrase):
+                    used.update(phrase)
+                    topics.append(TopicAnalysis(
+                        topic=surface[phrase].most_common(1)[0][0].title(),
+                        relevance=round(100 * size / sizes.most_common(1)[0][1], 1),
+                        mentions=phrase_counts[phrase]
+                    ))
+                    break
+
+        # Few clusters (short texts): top up with the best remaining phrases
+        for phrase in sorted(phrase_scores, key=phrase_scores.get, reverse=True):
+            if len(topics) >= min(self.num_topics, len(phrase_scores)):
+                break
+            if used.isdisjoint(phrase):
+                used.update(phrase)
+                topics.append(TopicAnalysis(
+                    topic=surface[phrase].most_common(1)[0][0].title(),
+                    relevance=round(100 * phrase_scores[phrase] / max(phrase_scores.values()) / 2, 1),
+                    mentions=phrase_counts[phrase]
+                ))
+        return topics
+
+topic_extractor = TopicExtractor()
@@ -0,0 +1,136 @@
+import asyncio
+import math
+import re
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from services.text_normalizer import TOKEN_PATTERN
+from services.topic_service import topic_extractor
+from core.logger import logger
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WINDOW_WORDS = 40
+_TOP_KEYWORDS = 20
+_CENTRALITY_WEIGHT = 0.6
+# Maximal marginal relevance trade-off between a sentence's score and its novelty
+_RELEVANCE_WEIGHT = 0.5
+# Selection targets this share of the estimated budget, leaving room for estimate error
+_SAFETY_MARGIN = 0.95
+
+Vector = Dict[str, float]
+
+def _dot(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+class TranscriptCompressor:
+    """Extractive compression of a transcript to fit a model token budget.
+
+    Sentences (or 40-word windows, for unpunctuated auto-captions) are
+    scored by centrality, the cosine similarity of their TF-IDF vector to
+    the whole transcript, and by coverage of the transcript's top keywords.
+    They are then picked greedily by score minus similarity to what is
+    already picked (maximal marginal relevance), so the result spans the
+    whole video rather than repeating its main point, and joined in their
+    original order.
+
+    Selection works on a characters-per-token estimate, so condensing
+    costs a single call to the model's token counter: the selected text is
+    measured once, and if it came out over budget it is selected again
+    with the ratio that measurement implies. The corrected ratio is local
+    to that call; chars_per_token itself never changes.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+        self.stop_words = topic_extractor.stop_words
+
+    def sentences(self, text: str) -> List[str]:
+        sentences = []
+        for sentence in _SENTENCE_SPLIT.split(text):
+            words = sentence.split()
+            for start in range(0, len(words), _WINDOW_WORDS):
+                sentences.append(" ".join(words[start:start + _WINDOW_WORDS]))
+        return [sentence for sentence in sentences if sentence]
+
+    def _terms(self, sentence: str) -> List[str]:
+        return [
+            word for word in (token.lower() for token in TOKEN_PATTERN.findall(sentence))
+            if word.isalpha() and len(word) > 2 and word not in self.stop_words
+        ]
+
+    def select(self, sentences: List[str], max_chars: int) -> str:
+        """The best sentences that fit in max_chars, in their original order"""
+        terms = [self._terms(sentence) for sentence in sentences]
+        document_frequency = Counter(term for sentence_terms in terms for term in set(sentence_terms))
+        idf = {term: math.log((1 + len(sentences)) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        vectors = []
+        for sentence_terms in terms:
+            vector = {term: count * idf[term] for term, count in Counter(sentence_terms).items()}
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            vectors.append({term: weight / norm for term, weight in vector.items()} if norm else {})
+
+        centroid = Counter()
+        for vector in vectors:
+            centroid.update(vector)
+        centroid_norm = math.sqrt(sum(weight * weight for weight in centroid.values())) or 1.0
+        keywords = {term for term, _ in Counter(term for sentence_terms in terms for term in sentence_terms)
+                    .most_common(_TOP_KEYWORDS)}
+
+        scores = [
+            _CENTRALITY_WEIGHT * _dot(vector, centroid) / centroid_norm
+            + (1 - _CENTRALITY_WEIGHT) * len(keywords.intersection(sentence_terms)) / max(1, len(keywords))
+            for vector, sentence_terms in zip(vectors, terms)
+        ]
+        top_score = max(scores, default=0) or 1.0
+        scores = [score / top_score for score in scores]
+
+        selected, used = [], 0
+        redundancy = [0.0] * len(sentences)
+        remaining = set(range(len(sentences)))
+        shortest = min((len(sentence) for sentence in sentences), default=0) + 1
+        while remaining and max_chars - used >= shortest:
+            best = max(
+                remaining,
+                key=lambda index: _RELEVANCE_WEIGHT * scores[index] - (1 - _RELEVANCE_WEIGHT) * redundancy[index]
+            )
+            remaining.discard(best)
+            if used + len(sentences[best]) + 1 > max_chars:
+                continue
+            selected.append(best)
+            used += len(sentences[best]) + 1
+            for index in remaining:
+                redundancy[index] = max(redundancy[index], _dot(vectors[index], vectors[best]))
+        return " ".join(sentences[index] for index in sorted(selected))
+
+    def estimate(self, text: str, token_budget: int) -> str:
+        """Condense text to token_budget tokens by the characters-per-token estimate alone"""
+        if len(text) <= token_budget * self.chars_per_token * 0.8:
+            return text
+        return self.select(self.sentences(text), int(token_budget * self.chars_per_token))
+
+    async def compress(self, text: str, token_budget: int,
+                       count_tokens: Callable[[str], Awaitable[Optional[int]]]) -> str:
+        """Condense text to about token_budget tokens, checked once with count_tokens"""
+        if len(text) <= token_budget * self.chars_per_token * 0.8:
+            return text
+
+        sentences = self.sentences(text)
+        candidate = await asyncio.to_thread(
+            self.select, sentences, int(token_budget * self.chars_per_token * _SAFETY_MARGIN)
+        )
+        tokens = await count_tokens(candidate)
+        if tokens is None or tokens <= token_budget:
+            # Unmeasured or within budget: the estimate stands
+            return candidate
+
+        chars_per_token = len(candidate) / tokens
+        logger.info(f"Transcript measured {tokens} tokens against a budget of {token_budget}; "
+                    f"reselecting at {chars_per_token:.2f} chars per token")
+        return await asyncio.to_thread(
+            self.select, sentences, int(token_budget * chars_per_token * _SAFETY_MARGIN)
+        )
+
+transcript_compressor = TranscriptCompressor()
@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+from typing import List, Optional, Sequence
+
+from youtube_transcript_api import YouTubeTranscriptApi, CouldNotRetrieveTranscript
+
+from models.schemas import TranscriptEntry
+from core.config import settings
+from core.logger import logger
+
+class TranscriptStore:
+    """Compressed on-disk store of timed transcript entries keyed by video id and language.
+
+    Each transcript is kept as one gzip-compressed JSON document in columnar form
+    (texts, starts and durations in milliseconds as parallel arrays), which keeps
+    files small while preserving the per-entry offsets.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or settings.transcript_cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, video_id: str, language: str) -> str:
+        key = re.sub(r'[^\w\-]', '_', f"{video_id}.{language}")
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def load(self, video_id: str, language: str) -> Optional[List[TranscriptEntry]]:
+        """Load a stored transcript, or None when it is not on disk"""
+        path = self._path(video_id, language)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('v') != self.FORMAT_VERSION:
+                return None
+            return [
+                TranscriptEntry(text=text, start=start / 1000, duration=duration / 1000)
+                for text, start, duration in zip(data['text'], data['start'], data['duration'])
+            ]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable transcript cache {path}: {e}")
+            return None
+
+    def save(self, video_id: str, language: str, entries: List[TranscriptEntry]) -> None:
+        """Write a transcript to disk atomically"""
+        data = {
+            'v': self.FORMAT_VERSION,
+            'video_id': video_id,
+            'language': language,
+            'text': [entry.text for entry in entries],
+            'start': [round(entry.start * 1000) for entry in entries],
+            'duration': [round(entry.duration * 1000) for entry in entries],
+        }
+        path = self._path(video_id, language)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not store transcript for video {video_id}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _fetch(self, video_id: str, languages: Sequence[str]):
+        """Blocking fetch from YouTube; returns (language_code, entries)"""
+        transcript = YouTubeTranscriptApi.list_transcripts(video_id).find_transcript(languages)
+        entries = [
+            TranscriptEntry(text=entry['text'], start=entry['start'], duration=entry.get('duration', 0.0))
+            for entry in transcript.fetch()
+        ]
+        return transcript.language_code, entries
+
+    async def get_entries(self, video_id: str, languages: Optional[Sequence[str]] = None) -> List[TranscriptEntry]:
+        """Return transcript entries from disk, fetching them off the event loop on a miss"""
+        languages = list(languages or settings.transcript_languages)
+        
+        for language in languages:
+            entries = await asyncio.to_thread(self.load, video_id, language)
+            if entries is not None:
+                return entries
+        
+        try:
+            language, entries = await asyncio.to_thread(self._fetch, video_id, languages)
+        except CouldNotRetrieveTranscript as e:
+            logger.warning(f"Could not fetch transcript for video {video_id}: {type(e).__name__}")
+            return []
+        except Exception as e:
+            logger.error(f"Transcript fetch error for video {video_id}: {e}")
+            return []
+        
+        await asyncio.to_thread(self.save, video_id, language, entries)
+        return entries
@@ -1,21 +1,8 @@
 import re
-from typing import List
-from collections import Counter
-
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+from typing import List, Tuple
 
 from core.config import settings
-
-# Initialize NLTK components
-try:
-    stop_words = set(stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
-except:
-    stop_words = set()
-    lemmatizer = None
+from services.text_normalizer import normalize, top_lemmas
 
 def extract_video_id(url: str) -> str:
     """Extract YouTube video ID from URL"""
@@ -31,28 +18,31 @@ def extract_video_id(url: str) -> str:
     
     raise ValueError("Invalid YouTube URL")
 
-def clean_text(text: str) -> str:
-    """Clean text by removing URLs, mentions, and extra whitespace"""
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"[@#]\w+", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text.lower()
-
 def extract_keywords(text: str, num_keywords: int = 10) -> List[str]:
     """Extract keywords from text using NLTK"""
     try:
-        if not lemmatizer:
-            return []
-            
-        tokens = word_tokenize(text.lower())
-        tokens = [lemmatizer.lemmatize(token) for token in tokens if token.isalpha()]
-        tokens = [token for token in tokens if token not in stop_words and len(token) > 2]
-        
-        word_freq = Counter(tokens)
-        return [word for word, freq in word_freq.most_common(num_keywords)]
+        return top_lemmas([normalize(text).lemmas], num_keywords)
     except:
         return []
 
+def parse_channel_ref(ref: str) -> Tuple[str, str]:
+    """Parse a channel URL, handle or id into a (kind, value) lookup pair"""
+    ref = ref.strip()
+    patterns = [
+        ("id", r'youtube\.com\/channel\/(UC[\w\-]{22})'),
+        ("handle", r'youtube\.com\/(@[\w\.\-]+)'),
+        ("username", r'youtube\.com\/user\/([\w\-]+)'),
+        ("id", r'^(UC[\w\-]{22})$'),
+        ("handle", r'^(@[\w\.\-]+)$'),
+    ]
+    
+    for kind, pattern in patterns:
+        match = re.search(pattern, ref)
+        if match:
+            return kind, match.group(1)
+    
+    raise ValueError("Invalid YouTube channel URL")
+
 def format_view_count(view_count: int) -> str:
     """Format view count into readable string"""
     if view_count >= 1000000:
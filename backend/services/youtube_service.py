@@ -1,21 +1,37 @@
 import re
+import asyncio
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
+import httplib2
 from fastapi import HTTPException
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from youtube_transcript_api import YouTubeTranscriptApi
 
-from models.schemas import VideoInfo, CommentData
+from models.schemas import VideoInfo, CommentData, TranscriptEntry
 from services.sentiment_service import SentimentService
-from services.utils import clean_text
+from services.transcript_store import TranscriptStore
+from services.dedup_service import group_duplicates
+from services.text_normalizer import normalize_stripped, strip_text
 from core.config import settings
 from core.logger import logger
+from core.quota import QuotaCounter, QuotaExceeded
 
 class YouTubeService:
     def __init__(self):
         self.youtube = build('youtube', 'v3', developerKey=settings.youtube_api_key)
         self.sentiment_service = SentimentService()
+        self.transcript_store = TranscriptStore()
+        self.quota = QuotaCounter("youtube", settings.youtube_daily_quota)
+
+    async def _execute(self, request, units: int = 1):
+        """Execute an API request off the event loop, charging the shared quota.
+
+        httplib2 is not thread-safe, so each call gets its own Http object.
+        The quota charge is a SharedStore write, so it runs off the loop too.
+        """
+        if units:
+            await asyncio.to_thread(self.quota.consume, units)
+        return await asyncio.to_thread(request.execute, http=httplib2.Http())
 
     async def get_video_info_enhanced(self, video_id: str) -> VideoInfo:
         """Enhanced video information fetching with metadata"""
@@ -24,7 +40,7 @@ class YouTubeService:
                 part="snippet,statistics,contentDetails",
                 id=video_id
             )
-            response = request.execute()
+            response = await self._execute(request)
             
             if not response['items']:
                 raise HTTPException(status_code=404, detail="Video not found")
@@ -68,59 +84,276 @@ class YouTubeService:
                 likes=int(statistics.get('likeCount', 0)),
                 dislikes=int(statistics.get('dislikeCount', 0)),
                 comments=int(statistics.get('commentCount', 0)),
-                description=snippet.get('description', '')
+                description=snippet.get('description', ''),
+                view_count=view_count,
+                channel_id=snippet.get('channelId', ''),
+                published_at=snippet['publishedAt']
             )
+        except QuotaExceeded as e:
+            logger.error(f"YouTube quota error: {e}")
+            raise HTTPException(status_code=429, detail="YouTube API quota exhausted")
         except HttpError as e:
             logger.error(f"YouTube API error: {e}")
             raise HTTPException(status_code=400, detail="Error fetching video information")
 
-    async def get_video_comments(self, video_id: str, max_results: int = 100) -> List[CommentData]:
+    async def _channel_ids_for_handle(self, handle: str) -> List[str]:
+        """Candidate channel ids for a handle, from a channel search.
+
+        The pinned API client's discovery document has no forHandle filter on
+        channels().list, so handles go through search (100 quota units).
+        """
+        request = self.youtube.search().list(part="id", q=handle, type="channel", maxResults=5)
+        response = await self._execute(request, units=100)
+        return [item['id']['channelId'] for item in response.get('items', []) if 'channelId' in item.get('id', {})]
+
+    async def resolve_channel(self, kind: str, value: str) -> dict:
+        """Look up a channel by id, handle or username and return its uploads playlist"""
+        try:
+            if kind == "handle":
+                channel_ids = await self._channel_ids_for_handle(value)
+                lookup = {"id": ",".join(channel_ids)} if channel_ids else None
+            else:
+                lookup = {"id": {"id": value}, "username": {"forUsername": value}}[kind]
+            response = {}
+            if lookup:
+                request = self.youtube.channels().list(part="snippet,contentDetails", **lookup)
+                response = await self._execute(request)
+        except QuotaExceeded as e:
+            logger.error(f"YouTube quota error: {e}")
+            raise HTTPException(status_code=429, detail="YouTube API quota exhausted")
+        except (HttpError, KeyError, TypeError) as e:
+            logger.error(f"YouTube API error: {e}")
+            raise HTTPException(status_code=400, detail="Error fetching channel information")
+        
+        items = response.get('items', [])
+        if kind == "handle":
+            # Search matches titles too; keep only the channel that owns the handle
+            items = [item for item in items if item['snippet'].get('customUrl', '').lower() == value.lower()]
+        if not items:
+            raise HTTPException(status_code=404, detail="Channel not found")
+        
+        channel = items[0]
+        return {
+            "channel_id": channel['id'],
+            "title": channel['snippet']['title'],
+            "uploads_playlist_id": channel['contentDetails']['relatedPlaylists']['uploads'],
+        }
+
+    async def get_playlist_videos(self, playlist_id: str, max_videos: int) -> List[dict]:
+        """Page through a playlist, returning video ids, titles and publish dates"""
+        videos = []
+        page_token = None
+        try:
+            while len(videos) < max_videos:
+                request = self.youtube.playlistItems().list(
+                    part="snippet,contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=min(50, max_videos - len(videos)),
+                    pageToken=page_token
+                )
+                response = await self._execute(request)
+                for item in response.get('items', []):
+                    videos.append({
+                        "video_id": item['contentDetails']['videoId'],
+                        "title": item['snippet'].get('title', ''),
+                        "published_at": item['contentDetails'].get('videoPublishedAt')
+                                        or item['snippet'].get('publishedAt', ''),
+                    })
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+        except (HttpError, QuotaExceeded) as e:
+            logger.error(f"Error fetching playlist {playlist_id}: {e}")
+        
+        return videos[:max_videos]
+
+    async def get_video_statistics(self, video_ids: List[str]) -> Dict[str, dict]:
+        """Raw view, like and comment counts for up to 50 videos per request"""
+        stats = {}
+        try:
+            for start in range(0, len(video_ids), 50):
+                request = self.youtube.videos().list(part="statistics", id=",".join(video_ids[start:start + 50]))
+                response = await self._execute(request)
+                for item in response.get('items', []):
+                    statistics = item['statistics']
+                    stats[item['id']] = {
+                        "views": int(statistics.get('viewCount', 0)),
+                        "likes": int(statistics.get('likeCount', 0)),
+                        "comments": int(statistics.get('commentCount', 0)),
+                    }
+        except (HttpError, QuotaExceeded) as e:
+            logger.error(f"Error fetching video statistics: {e}")
+        
+        return stats
+
+    async def get_video_comments(self, video_id: str, max_results: int = 100,
+                                 include_replies: Optional[bool] = None) -> List[CommentData]:
         """Fetch video comments from YouTube API with enhanced analysis"""
+        if include_replies is None:
+            include_replies = settings.include_replies
+        
         comments = []
         try:
+            raw_comments = []
+            async for page in self.iter_comment_pages(video_id, min(max_results, settings.max_comments), include_replies):
+                raw_comments.extend(page)
+            comments = self.score_comments(raw_comments)
+                
+        except (HttpError, QuotaExceeded) as e:
+            logger.error(f"Error fetching comments: {e}")
+        
+        return comments
+
+    async def reserve_comment_pages(self, limit: int) -> int:
+        """Charge the quota up front for the commentThreads pages of up to limit comments"""
+        pages = -(-limit // 100)
+        try:
+            await asyncio.to_thread(self.quota.consume, pages)
+        except QuotaExceeded as e:
+            logger.error(f"YouTube quota error: {e}")
+            raise HTTPException(status_code=429, detail="YouTube API quota exhausted")
+        return pages
+
+    async def iter_comment_pages(self, video_id: str, limit: int, include_replies: bool = False,
+                                 prepaid: bool = False) -> AsyncIterator[List[dict]]:
+        """Yield raw comment resources one commentThreads page (up to 100 threads) at a time.
+
+        With include_replies each page is followed by its threads' replies, so
+        callers can process arbitrarily many comments in bounded memory. With
+        prepaid the caller has already charged the quota for the thread pages.
+        """
+        fetched = 0
+        page_token = None
+        while fetched < limit:
             request = self.youtube.commentThreads().list(
-                part="snippet",
+                part="snippet,replies" if include_replies else "snippet",
                 videoId=video_id,
-                maxResults=min(max_results, settings.max_comments),
+                maxResults=min(100, limit - fetched),
                 order="relevance",
-                textFormat="plainText"
+                textFormat="plainText",
+                pageToken=page_token
             )
-            response = request.execute()
+            response = await self._execute(request, units=0 if prepaid else 1)
+            threads = response['items']
+            fetched += len(threads)
             
-            for item in response['items']:
-                comment = item['snippet']['topLevelComment']['snippet']
-                text = clean_text(comment['textDisplay'])
-                sentiment, score = self.sentiment_service.analyze_sentiment_advanced(text)
-                
-                comments.append(CommentData(
-                    author=comment['authorDisplayName'],
-                    text=comment['textDisplay'],
-                    sentiment=sentiment.lower(),
-                    sentiment_score=score,
-                    likes=comment.get('likeCount', 0),
-                    published_at=comment['publishedAt']
-                ))
-                
-        except HttpError as e:
-            logger.error(f"Error fetching comments: {e}")
+            if include_replies:
+                yield await self._expand_threads(threads)
+            else:
+                yield [item['snippet']['topLevelComment'] for item in threads]
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+    async def _expand_threads(self, threads: List[dict]) -> List[dict]:
+        """Flatten comment threads into top-level comments followed by their replies.
+
+        commentThreads only inlines a few replies per thread; threads with more
+        are paged through comments().list, fetching across threads in parallel
+        with at most settings.reply_fetch_concurrency requests in flight.
+        """
+        semaphore = asyncio.Semaphore(settings.reply_fetch_concurrency)
+        
+        async def thread_replies(thread: dict) -> List[dict]:
+            inline = thread.get('replies', {}).get('comments', [])
+            if thread['snippet'].get('totalReplyCount', 0) <= len(inline):
+                return inline
+            async with semaphore:
+                return await self._fetch_replies(thread['id'], settings.max_replies_per_thread)
+        
+        replies = await asyncio.gather(*(thread_replies(thread) for thread in threads))
+        
+        raw_comments = []
+        for thread, reply_list in zip(threads, replies):
+            raw_comments.append(thread['snippet']['topLevelComment'])
+            raw_comments.extend(reply_list)
+        return raw_comments
+
+    async def _fetch_replies(self, parent_id: str, max_replies: int) -> List[dict]:
+        """Page through all replies to a top-level comment"""
+        replies = []
+        page_token = None
+        try:
+            while len(replies) < max_replies:
+                request = self.youtube.comments().list(
+                    part="snippet",
+                    parentId=parent_id,
+                    maxResults=min(100, max_replies - len(replies)),
+                    textFormat="plainText",
+                    pageToken=page_token
+                )
+                response = await self._execute(request)
+                replies.extend(response.get('items', []))
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+        except (HttpError, QuotaExceeded) as e:
+            logger.warning(f"Error fetching replies for comment {parent_id}: {e}")
+        
+        return replies[:max_replies]
+
+    def score_comments(self, raw_comments: List[dict], dedup: Optional[bool] = None) -> List[CommentData]:
+        """Score comment resources, collapsing exact and near-duplicates first.
+
+        Each duplicate group is represented by its most liked member, with
+        the group size carried in CommentData.weight. URLs and mentions are
+        stripped once per comment for grouping; each representative is then
+        normalized once, and that artifact feeds sentiment scoring and every
+        later stage (keywords, emotion, sampling).
+        """
+        if dedup is None:
+            dedup = settings.dedup_comments
+        snippets = [resource['snippet'] for resource in raw_comments]
+        stripped = [strip_text(comment['textDisplay']) for comment in snippets]
+        if dedup:
+            # group_duplicates does its own case and whitespace folding
+            groups = group_duplicates(stripped)
+        else:
+            groups = [[index] for index in range(len(raw_comments))]
+        
+        comments = []
+        for group in groups:
+            index = max(group, key=lambda i: snippets[i].get('likeCount', 0))
+            comment = snippets[index]
+            normalized = normalize_stripped(stripped[index])
+            try:
+                polarity, compound = self.sentiment_service.score_components(normalized.cleaned)
+                sentiment, score = self.sentiment_service.combine_scores(polarity, compound)
+            except Exception as e:
+                logger.warning(f"Sentiment scoring failed: {e}")
+                polarity, compound = None, None
+                sentiment, score = "NEUTRAL", 0.0
+            
+            comments.append(CommentData(
+                author=comment['authorDisplayName'],
+                text=comment['textDisplay'],
+                sentiment=sentiment.lower(),
+                sentiment_score=score,
+                likes=comment.get('likeCount', 0),
+                published_at=comment['publishedAt'],
+                weight=len(group),
+                comment_id=raw_comments[index].get('id'),
+                parent_id=comment.get('parentId'),
+                polarity=polarity,
+                vader_score=compound,
+                normalized=normalized,
+                group_authors=(
+                    sorted({snippets[i]['authorDisplayName'] for i in group}) if len(group) > 1 else None
+                )
+            ))
         
         return comments
 
+    async def get_transcript_entries(self, video_id: str) -> List[TranscriptEntry]:
+        """Get timed transcript entries, served from the on-disk store when available"""
+        return await self.transcript_store.get_entries(video_id)
+
     async def get_video_transcript(self, video_id: str) -> str:
-        """Get video transcript using youtube-transcript-api"""
-        try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            return ' '.join([entry['text'] for entry in transcript])
-        except:
-            logger.warning(f"Could not fetch transcript for video {video_id}")
-            return ""
-
-    def calculate_engagement_rate(self, comments: List[CommentData], views_str: str) -> float:
-        """Calculate engagement rate based on comments and views"""
-        try:
-            # Parse view count from string
-            view_count = int(views_str.split()[0].replace('M', '000000').replace('K', '000').replace(',', ''))
-            engagement_rate = (len(comments) / max(1, view_count)) * 100
-            return engagement_rate
-        except:
-            return 0.0
\ No newline at end of file
+        """Get video transcript text"""
+        entries = await self.get_transcript_entries(video_id)
+        return ' '.join(entry.text for entry in entries)
+
+    def calculate_engagement_rate(self, comment_count: int, view_count: int) -> float:
+        """Comments per hundred views, from the raw view count"""
+        return comment_count / max(1, view_count) * 100
\ No newline at end of file
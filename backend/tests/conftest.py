@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Module-level singletons open their SQLite files on import; keep them out of the working tree
+_STATE_DIR = tempfile.mkdtemp(prefix="insighttube-tests-")
+os.environ.setdefault("SHARED_STORE_PATH", os.path.join(_STATE_DIR, "shared_store.db"))
+os.environ.setdefault("SIMILARITY_INDEX_PATH", os.path.join(_STATE_DIR, "similarity.db"))
+os.environ.setdefault("COMMENT_INDEX_PATH", os.path.join(_STATE_DIR, "comments.db"))
+os.environ.setdefault("HISTORY_STORE_PATH", os.path.join(_STATE_DIR, "history.db"))
+os.environ.setdefault("TRANSCRIPT_CACHE_DIR", os.path.join(_STATE_DIR, "transcripts"))
+
+from core.shared_store import SharedStore
+from models.schemas import CommentData
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(str(tmp_path / "store.db"))
+
+@pytest.fixture
+def make_comment():
+    def make(text, likes=0, sentiment="Neutral", day=1, author=None, weight=1):
+        return CommentData(
+            author=author or f"user-{text[:8]}",
+            text=text,
+            sentiment=sentiment,
+            sentiment_score=0.0,
+            likes=likes,
+            published_at=f"2024-01-{day:02d}T00:00:00Z",
+            weight=weight
+        )
+    return make
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from core.admission import AdmissionController, Overloaded
+
+async def hold(controller, started, release):
+    async with controller.admit():
+        started.set()
+        await release.wait()
+
+@pytest.mark.asyncio
+async def test_admits_up_to_max_inflight():
+    controller = AdmissionController("test", max_inflight=2, max_queue=0, queue_timeout=1.0)
+    release = asyncio.Event()
+    holders = [asyncio.Event(), asyncio.Event()]
+    tasks = [asyncio.create_task(hold(controller, started, release)) for started in holders]
+    await asyncio.gather(*(started.wait() for started in holders))
+    assert controller.snapshot()["in_flight"] == 2
+    assert controller.saturation == 1.0
+    release.set()
+    await asyncio.gather(*tasks)
+    assert controller.snapshot()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_429():
+    controller = AdmissionController("test", max_inflight=1, max_queue=1, queue_timeout=5.0)
+    release, started = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(hold(controller, started, release))
+    await started.wait()
+    waiter = asyncio.create_task(hold(controller, asyncio.Event(), release))
+    await asyncio.sleep(0)
+    assert controller.snapshot()["queued"] == 1
+
+    with pytest.raises(Overloaded) as excinfo:
+        async with controller.admit():
+            pass
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert controller.snapshot()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_queue_timeout_is_rejected_with_503():
+    controller = AdmissionController("test", max_inflight=1, max_queue=1, queue_timeout=5.0)
+    release, started = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(hold(controller, started, release))
+    await started.wait()
+
+    with pytest.raises(Overloaded) as excinfo:
+        async with controller.admit(timeout=0.01):
+            pass
+    assert excinfo.value.status_code == 503
+    assert controller.snapshot()["queued"] == 0
+
+    release.set()
+    await holder
+
+@pytest.mark.asyncio
+async def test_slot_is_released_when_the_block_raises():
+    controller = AdmissionController("test", max_inflight=1, max_queue=0, queue_timeout=1.0)
+    with pytest.raises(RuntimeError):
+        async with controller.admit():
+            raise RuntimeError("boom")
+    async with controller.admit():
+        assert controller.snapshot()["in_flight"] == 1
+
+@pytest.mark.asyncio
+async def test_burst_in_one_tick_does_not_oversubscribe():
+    controller = AdmissionController("test", max_inflight=1, max_queue=0, queue_timeout=1.0)
+    release = asyncio.Event()
+    results = await asyncio.gather(
+        *(hold(controller, asyncio.Event(), release) for _ in range(3)),
+        release_soon(release),
+        return_exceptions=True
+    )
+    rejected = [result for result in results if isinstance(result, Overloaded)]
+    assert len(rejected) == 2
+
+async def release_soon(release):
+    await asyncio.sleep(0.01)
+    release.set()
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from services.analysis_cache import AnalysisCache
+
+RESPONSE = {
+    "video_info": {"title": "A video"},
+    "summary": "A summary",
+    "topics": [],
+    "processing_time": 1.5,
+    "skipped_stages": [],
+    "degraded_stages": [],
+}
+
+@pytest.fixture
+def runs(monkeypatch, store):
+    runs = []
+    async def run_analysis(video_id, plan):
+        runs.append(video_id)
+        return RESPONSE
+    monkeypatch.setattr(routes, "analysis_cache", AnalysisCache(store=store))
+    monkeypatch.setattr(routes, "run_analysis", run_analysis)
+    return runs
+
+@pytest.fixture
+def client(runs):
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+def test_first_request_returns_validators(client, runs):
+    response = client.get("/analysis/abc")
+    assert response.status_code == 200
+    assert response.json() == RESPONSE
+    assert response.headers["ETag"].startswith('W/"')
+    assert "Last-Modified" in response.headers
+    assert "stale-while-revalidate" in response.headers["Cache-Control"]
+    assert runs == ["abc"]
+
+def test_matching_etag_gets_304_without_recomputation(client, runs):
+    etag = client.get("/analysis/abc").headers["ETag"]
+    response = client.get("/analysis/abc", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert runs == ["abc"]
+
+def test_strong_and_listed_etags_match(client):
+    etag = client.get("/analysis/abc").headers["ETag"].removeprefix("W/")
+    assert client.get("/analysis/abc", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/analysis/abc", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get("/analysis/abc", headers={"If-None-Match": "*"}).status_code == 304
+
+def test_stale_etag_gets_the_full_body(client):
+    client.get("/analysis/abc")
+    response = client.get("/analysis/abc", headers={"If-None-Match": 'W/"stale"'})
+    assert response.status_code == 200
+    assert response.json() == RESPONSE
+
+def test_if_modified_since(client):
+    last_modified = client.get("/analysis/abc").headers["Last-Modified"]
+    assert client.get("/analysis/abc", headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = {"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+    assert client.get("/analysis/abc", headers=earlier).status_code == 200
+    assert client.get("/analysis/abc", headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+def test_if_none_match_takes_precedence(client):
+    last_modified = client.get("/analysis/abc").headers["Last-Modified"]
+    headers = {"If-None-Match": 'W/"stale"', "If-Modified-Since": last_modified}
+    assert client.get("/analysis/abc", headers=headers).status_code == 200
+
+def test_each_projection_has_its_own_etag(client, runs):
+    full = client.get("/analysis/abc").headers["ETag"]
+    projected = client.get("/analysis/abc", params={"fields": "summary"})
+    assert projected.json() == {
+        "summary": "A summary", "processing_time": 1.5, "skipped_stages": [], "degraded_stages": []
+    }
+    assert projected.headers["ETag"] != full
+    revalidated = client.get(
+        "/analysis/abc", params={"fields": "summary"}, headers={"If-None-Match": projected.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+    assert client.get("/analysis/abc", params={"fields": "summary"}, headers={"If-None-Match": full}).status_code == 200
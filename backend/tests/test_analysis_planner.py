@@ -0,0 +1,64 @@
+import pytest
+
+from core.config import settings
+from models.schemas import AnalysisOptions
+from services.analysis_planner import ANALYSIS_STAGES, AnalysisPlan, build_plan, project_response
+
+def test_default_options_skip_only_emotion():
+    plan = build_plan(AnalysisOptions())
+    assert plan.skipped_stages == ["emotion", "transcript_emotion"]
+    assert plan.fetches == {"comments", "transcript"}
+
+def test_disabled_stages_drop_their_fetches():
+    plan = build_plan(AnalysisOptions(
+        include_comments=False, include_sentiment=False, include_keywords=False
+    ))
+    assert plan.stages == {"summary", "topics"}
+    assert not plan.fetches_comments()
+    assert plan.fetches_transcript()
+
+def test_emotion_needs_a_sample():
+    assert build_plan(AnalysisOptions(include_emotion=True)).includes("emotion")
+    assert not build_plan(AnalysisOptions(include_emotion=True, emotion_sample_size=0)).includes("emotion")
+
+def test_field_selection_narrows_stages():
+    plan = build_plan(AnalysisOptions(fields="summary,top_comments"))
+    assert plan.stages == {"summary", "top_comments"}
+
+def test_video_info_only_runs_no_stages():
+    plan = build_plan(AnalysisOptions(fields=["video_info"]))
+    assert plan.stages == set()
+    assert plan.skipped_stages == ANALYSIS_STAGES
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="bogus"):
+        build_plan(AnalysisOptions(fields=["summary", "bogus"]))
+
+def test_streaming_starts_above_the_exact_cap():
+    assert not build_plan(AnalysisOptions(max_comments=settings.max_comments)).streams_comments()
+    assert build_plan(AnalysisOptions(max_comments=settings.max_comments + 1)).streams_comments()
+    assert not build_plan(AnalysisOptions(
+        max_comments=settings.max_comments + 1, include_comments=False, include_sentiment=False,
+        include_keywords=False
+    )).streams_comments()
+
+def test_deadline_is_capped_by_the_inflight_lease():
+    plan = AnalysisPlan(set(), deadline_seconds=settings.inflight_lease_ttl * 10)
+    assert plan.deadline_seconds == settings.inflight_lease_ttl
+
+def test_cache_key_covers_result_shaping_options():
+    base = build_plan(AnalysisOptions())
+    assert base.cache_key("abc") == build_plan(AnalysisOptions()).cache_key("abc")
+    assert base.cache_key("abc").startswith("abc:")
+    assert base.cache_key("abc") != base.cache_key("xyz")
+    assert base.cache_key("abc") != build_plan(AnalysisOptions(max_comments=50)).cache_key("abc")
+    assert base.cache_key("abc") != build_plan(AnalysisOptions(include_summary=False)).cache_key("abc")
+    # The deadline does not change the result, only how long it may take
+    assert base.cache_key("abc") == build_plan(AnalysisOptions(deadline_seconds=5)).cache_key("abc")
+
+def test_project_response_keeps_always_returned_sections():
+    response = {"summary": "s", "topics": [], "processing_time": 1.0, "skipped_stages": [], "degraded_stages": []}
+    assert project_response(response, None) is response
+    assert project_response(response, ["summary"]) == {
+        "summary": "s", "processing_time": 1.0, "skipped_stages": [], "degraded_stages": []
+    }
@@ -0,0 +1,83 @@
+import pytest
+
+import core.circuit_breaker as circuit_breaker
+from core.circuit_breaker import CircuitBreaker
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=3, slow_call_threshold=5.0, recovery_timeout=30.0)
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.snapshot()["rejected_calls"] == 1
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_slow_calls_count_as_failures(breaker):
+    for _ in range(3):
+        breaker.record_success(6.0)
+    assert breaker.is_open()
+
+def test_half_open_admits_one_trial_call(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+def test_trial_success_closes(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_trial_failure_reopens(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.is_open()
+    assert breaker.snapshot()["retry_in"] == 30.0
+
+def test_late_success_does_not_close_an_open_circuit(breaker, clock):
+    trip(breaker)
+    breaker.record_success(0.1)
+    assert breaker.is_open()
+    clock.now += 29
+    assert breaker.is_open()
+
+def test_released_trial_slot_can_be_reused(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
@@ -0,0 +1,43 @@
+from services.comment_sampler import representative_sample
+
+def test_empty_inputs():
+    assert representative_sample([], 5) == []
+
+def test_zero_size(make_comment):
+    assert representative_sample([make_comment("hello there")], 0) == []
+
+def test_duplicates_are_kept_once_as_the_most_liked_copy(make_comment):
+    comments = [
+        make_comment("Great video", likes=1, author="a"),
+        make_comment("great video", likes=9, author="b"),
+        make_comment("Terrible audio", likes=2, sentiment="Negative"),
+    ]
+    sample = representative_sample(comments, 10)
+    assert len(sample) == 2
+    assert [comment.author for comment in sample if comment.text.lower().startswith("great")] == ["b"]
+
+def test_sample_size_is_bounded(make_comment):
+    comments = [make_comment(f"distinct comment number {i}", likes=i, day=1 + i % 28) for i in range(100)]
+    assert len(representative_sample(comments, 12)) == 12
+
+def test_every_sentiment_is_represented(make_comment):
+    comments = [make_comment(f"happy comment {i}", sentiment="Positive") for i in range(90)]
+    comments += [make_comment(f"angry comment {i}", sentiment="Negative") for i in range(5)]
+    comments += [make_comment(f"plain comment {i}") for i in range(5)]
+    sample = representative_sample(comments, 10)
+    assert {comment.sentiment for comment in sample} == {"Positive", "Negative", "Neutral"}
+    assert sum(comment.sentiment == "Positive" for comment in sample) >= 5
+
+def test_duplicate_weight_counts_towards_allocation(make_comment):
+    comments = [make_comment(f"positive comment {i}", sentiment="Positive", day=1) for i in range(10)]
+    comments += [make_comment(f"negative comment {i}", sentiment="Negative", day=1, weight=20) for i in range(10)]
+    sample = representative_sample(comments, 6)
+    assert sum(comment.sentiment == "Negative" for comment in sample) > sum(
+        comment.sentiment == "Positive" for comment in sample
+    )
+
+def test_character_budget_is_respected(make_comment):
+    comments = [make_comment(f"a reasonably long comment about topic {i}", likes=i, day=1 + i % 28) for i in range(50)]
+    sample = representative_sample(comments, 50, max_chars=200, text_chars=30)
+    assert sample
+    assert sum(min(len(comment.text), 30) + 1 for comment in sample) <= 200
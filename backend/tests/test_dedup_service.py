@@ -0,0 +1,28 @@
+from services.dedup_service import group_duplicates, minhash, normalize_for_dedup
+
+def test_normalize_folds_case_punctuation_and_elongation():
+    assert normalize_for_dedup("  FIRST!!!   Sooooo   good ") == "first soo good"
+    assert normalize_for_dedup("first soo good") == normalize_for_dedup("First... sooo GOOD")
+
+def test_minhash_is_deterministic_within_a_process():
+    assert minhash("the same text") == minhash("the same text")
+    assert minhash("the same text") != minhash("an entirely different text")
+
+def test_exact_duplicates_group_after_normalization():
+    texts = ["First!", "great video", "first", "FIRST!!!", "Great video."]
+    assert group_duplicates(texts, similarity=1.0, min_tokens=100) == [[0, 2, 3], [1, 4]]
+
+def test_near_duplicates_merge_above_threshold():
+    spam = "check out my channel for free giveaway every single day of the week"
+    texts = [spam, spam + " now", "this tutorial finally made decorators click for me"]
+    groups = group_duplicates(texts, similarity=0.5, min_tokens=3)
+    assert [0, 1] in groups
+    assert [2] in groups
+
+def test_short_texts_are_not_sketched():
+    texts = ["nice one", "nice two"]
+    assert group_duplicates(texts, similarity=0.0, min_tokens=5) == [[0], [1]]
+
+def test_groups_follow_first_appearance():
+    texts = ["b", "a", "b", "c", "a"]
+    assert group_duplicates(texts, similarity=1.0, min_tokens=100) == [[0, 2], [1, 4], [3]]
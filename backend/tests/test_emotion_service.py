@@ -0,0 +1,65 @@
+import pytest
+
+from services.emotion_service import EmotionClassifier
+from services.text_normalizer import normalize
+
+@pytest.fixture
+def classifier():
+    return EmotionClassifier()
+
+@pytest.mark.parametrize("text, emotion", [
+    ("I love this so much", "Joy"),
+    ("This made me so sad, I miss him", "Sadness"),
+    ("This is the worst, I hate it", "Anger"),
+    ("That jump scare terrified me", "Fear"),
+    ("Wow what a plot twist, totally unexpected", "Surprise"),
+    ("That food looks disgusting", "Disgust"),
+    ("The video is ten minutes long", "Neutral"),
+    ("😂😂", "Joy"),
+])
+def test_lexicon_labels(classifier, text, emotion):
+    assert classifier.classify(text) == emotion
+
+@pytest.mark.parametrize("text", [
+    "wait for the next one",
+    "I believe in you",
+    "going down the hill",
+    "sick beat",
+])
+def test_context_dependent_words_need_their_phrase(classifier, text):
+    assert classifier.classify(text) == "Neutral"
+
+@pytest.mark.parametrize("text, emotion", [
+    ("wait what", "Surprise"),
+    ("I feel down today", "Sadness"),
+    ("mind blown", "Surprise"),
+])
+def test_phrases(classifier, text, emotion):
+    assert classifier.classify(text) == emotion
+
+def test_negated_joy_becomes_mild_sadness(classifier):
+    scores = classifier.score_tokens(classifier.tokenize("I do not love this"))
+    assert scores["Joy"] == 0
+    assert scores["Sadness"] == 0.75
+
+def test_negation_cancels_other_emotions(classifier):
+    assert classifier.classify("I am not angry") == "Neutral"
+
+def test_intensifiers_shouting_and_exclamations_amplify(classifier):
+    plain = classifier.score_tokens(classifier.tokenize("good"))["Joy"]
+    assert classifier.score_tokens(classifier.tokenize("very good"))["Joy"] == plain * 1.5
+    assert classifier.score_tokens(classifier.tokenize("GOOD"))["Joy"] == plain * 1.5
+    assert classifier.score_tokens(classifier.tokenize("good"), exclamations=5)["Joy"] == pytest.approx(plain * 1.3)
+
+def test_elongated_words_are_recognized(classifier):
+    assert classifier.classify("sooo saaad") == "Sadness"
+
+def test_inflections_fall_back_to_the_stem(classifier):
+    assert classifier.classify("she was crying") == "Sadness"
+
+def test_min_score_sets_the_neutral_floor():
+    assert EmotionClassifier(min_score=2.0).classify("good") == "Neutral"
+
+def test_normalized_input_matches_raw_text(classifier):
+    text = "Honestly the ending was SO sad!!"
+    assert classifier.classify_normalized(normalize(text)) == classifier.classify(text)
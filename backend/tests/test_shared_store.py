@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+
+def test_set_get_and_delete(store):
+    assert store.get("missing") is None
+    store.set("key", {"a": [1, 2]})
+    assert store.get("key") == {"a": [1, 2]}
+    store.delete("key")
+    assert store.get("key") is None
+
+def test_expired_values_read_as_missing(store):
+    store.set("key", "value", ttl=0.01)
+    time.sleep(0.02)
+    assert store.get("key") is None
+
+def test_update_is_atomic_across_threads(store):
+    def append(current):
+        return (current or []) + [threading.get_ident()]
+
+    threads = [threading.Thread(target=lambda: [store.update("list", append) for _ in range(10)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store.get("list")) == 40
+
+def test_update_rolls_back_on_error(store):
+    store.set("key", 1)
+    def fail(current):
+        raise RuntimeError("boom")
+    try:
+        store.update("key", fail)
+    except RuntimeError:
+        pass
+    assert store.get("key") == 1
+    assert store.update("key", lambda current: current + 1) == 2
+
+def test_incr_counts_atomically_across_threads(store):
+    threads = [threading.Thread(target=lambda: [store.incr("counter") for _ in range(25)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.get("counter") == 100
+
+def test_incr_keeps_the_first_expiry(store):
+    store.incr("counter", 5, ttl=0.05)
+    assert store.incr("counter", ttl=60) == 6
+    time.sleep(0.06)
+    assert store.incr("counter") == 1
+
+def test_lease_is_exclusive_until_it_expires(store):
+    assert store.acquire_lease("lease", ttl=0.05)
+    assert not store.acquire_lease("lease", ttl=0.05)
+    time.sleep(0.06)
+    assert store.acquire_lease("lease", ttl=0.05)
+
+def test_renew_fails_once_the_lease_is_lost(store):
+    assert store.acquire_lease("lease", ttl=0.05)
+    assert store.renew_lease("lease", ttl=0.05)
+    time.sleep(0.06)
+    assert not store.renew_lease("lease", ttl=0.05)
+
+def test_release_leaves_another_holders_lease(store):
+    store.set("lease", os.getpid() + 1, ttl=60)
+    store.release_lease("lease")
+    assert store.get("lease") == os.getpid() + 1
+    assert store.acquire_lease("own", ttl=60)
+    store.release_lease("own")
+    assert store.get("own") is None
+
+def test_purge_expired_deletes_only_expired_rows(store):
+    store.set("old", 1, ttl=0.01)
+    store.set("new", 2, ttl=60)
+    store.set("forever", 3)
+    time.sleep(0.02)
+    store.purge_expired()
+    keys = [row[0] for row in store._connection().execute("SELECT key FROM kv ORDER BY key")]
+    assert keys == ["forever", "new"]
@@ -0,0 +1,96 @@
+import math
+import random
+import statistics
+
+from services.sketches import CountMinSketch, HeavyHitters, HyperLogLog, ReservoirSample, StreamingStats, TopK
+
+def test_count_min_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=4)
+    counts = {f"item-{i}": i % 7 + 1 for i in range(500)}
+    for item, count in counts.items():
+        sketch.add(item, count)
+    assert sketch.total == sum(counts.values())
+    assert all(sketch.estimate(item) >= count for item, count in counts.items())
+
+def test_count_min_is_exact_without_collisions():
+    sketch = CountMinSketch()
+    assert sketch.add("a", 3) == 3
+    assert sketch.add("a") == 4
+    assert sketch.estimate("b") == 0
+
+def test_heavy_hitters_reports_frequent_items():
+    hitters = HeavyHitters(k=5)
+    rng = random.Random(7)
+    for _ in range(2000):
+        hitters.add(f"noise-{rng.randrange(1000)}")
+    for item, count in (("python", 300), ("rust", 200), ("go", 100)):
+        for _ in range(count):
+            hitters.add(item)
+    top = dict(hitters.top(3))
+    assert list(top) == ["python", "rust", "go"]
+    assert top["python"] >= 300
+
+def test_hyperloglog_within_error_bound():
+    hll = HyperLogLog(p=12)
+    for i in range(20000):
+        hll.add(f"author-{i}")
+        hll.add(f"author-{i}")
+    relative_error = abs(hll.count() - 20000) / 20000
+    assert relative_error < 4 * 1.04 / math.sqrt(hll.m)
+
+def test_hyperloglog_small_counts_are_close():
+    hll = HyperLogLog()
+    assert hll.count() == 0
+    for name in ("a", "b", "c", "a"):
+        hll.add(name)
+    assert hll.count() == 3
+
+def test_reservoir_keeps_k_items_from_the_stream():
+    sample = ReservoirSample(10, seed=1)
+    for i in range(1000):
+        sample.add(i)
+    assert sample.seen == 1000
+    assert len(sample.items) == 10
+    assert len(set(sample.items)) == 10
+    assert all(0 <= item < 1000 for item in sample.items)
+
+def test_reservoir_shorter_stream_keeps_everything():
+    sample = ReservoirSample(10, seed=1)
+    for i in range(4):
+        sample.add(i)
+    assert sample.items == [0, 1, 2, 3]
+
+def test_top_k_is_exact_and_stable():
+    top = TopK(3, key=lambda pair: pair[1])
+    for pair in [("a", 1), ("b", 5), ("c", 3), ("d", 5), ("e", 2), ("f", 4)]:
+        top.add(pair)
+    # Ties keep the earlier item first
+    assert top.items() == [("b", 5), ("d", 5), ("f", 4)]
+
+def test_streaming_stats_match_exact_statistics():
+    rng = random.Random(3)
+    values = [rng.uniform(-1, 1) for _ in range(5000)]
+    stats = StreamingStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == len(values)
+    assert math.isclose(stats.mean, statistics.fmean(values), abs_tol=1e-9)
+    assert math.isclose(stats.variance, statistics.pvariance(values), rel_tol=1e-9)
+    assert stats.min == min(values) and stats.max == max(values)
+    bin_width = (stats.high - stats.low) / stats.bins
+    assert abs(stats.quantile(0.5) - statistics.median(values)) <= bin_width
+
+def test_streaming_stats_weights_count_as_repeats():
+    weighted, repeated = StreamingStats(), StreamingStats()
+    weighted.add(0.5, weight=3)
+    weighted.add(-0.5)
+    for value in (0.5, 0.5, 0.5, -0.5):
+        repeated.add(value)
+    assert weighted.count == repeated.count
+    assert math.isclose(weighted.mean, repeated.mean)
+    assert math.isclose(weighted.variance, repeated.variance)
+
+def test_streaming_stats_empty():
+    stats = StreamingStats()
+    assert stats.variance == 0.0
+    assert stats.quantile(0.5) == 0.0
@@ -0,0 +1,73 @@
+import pytest
+
+from services.transcript_compressor import TranscriptCompressor
+
+TRANSCRIPT = " ".join(
+    f"In part {i} we cover python decorators, closures and topic {i % 7} with example {i * 3}."
+    for i in range(300)
+)
+
+class TokenCounter:
+    """Fake model token counter at a fixed characters-per-token ratio"""
+
+    def __init__(self, chars_per_token):
+        self.chars_per_token = chars_per_token
+        self.calls = []
+
+    async def __call__(self, text):
+        self.calls.append(text)
+        return int(len(text) / self.chars_per_token)
+
+@pytest.fixture
+def compressor():
+    return TranscriptCompressor()
+
+def test_sentences_split_unpunctuated_text_into_windows(compressor):
+    sentences = compressor.sentences(" ".join(["word"] * 100))
+    assert [len(sentence.split()) for sentence in sentences] == [40, 40, 20]
+
+def test_select_fits_and_keeps_original_order(compressor):
+    sentences = compressor.sentences(TRANSCRIPT)
+    selected = compressor.select(sentences, 500)
+    assert 0 < len(selected) <= 500
+    positions = [TRANSCRIPT.index(sentence) for sentence in compressor.sentences(selected)]
+    assert positions == sorted(positions)
+
+def test_estimate_leaves_short_text_alone(compressor):
+    assert compressor.estimate("A short transcript.", 100) == "A short transcript."
+    assert len(compressor.estimate(TRANSCRIPT, 100)) <= 400
+
+@pytest.mark.asyncio
+async def test_short_text_is_not_measured(compressor):
+    counter = TokenCounter(4.0)
+    assert await compressor.compress("A short transcript.", 100, counter) == "A short transcript."
+    assert counter.calls == []
+
+@pytest.mark.asyncio
+async def test_estimate_within_budget_is_measured_once(compressor):
+    counter = TokenCounter(5.0)
+    condensed = await compressor.compress(TRANSCRIPT, 200, counter)
+    assert len(counter.calls) == 1
+    assert counter.calls[0] == condensed
+    assert len(condensed) / 5.0 <= 200
+
+@pytest.mark.asyncio
+async def test_over_budget_measurement_reselects_without_measuring_again(compressor):
+    counter = TokenCounter(3.0)
+    condensed = await compressor.compress(TRANSCRIPT, 200, counter)
+    assert len(counter.calls) == 1
+    assert len(condensed) < len(counter.calls[0])
+    assert len(condensed) / 3.0 <= 200
+
+@pytest.mark.asyncio
+async def test_calibration_does_not_leak_between_calls(compressor):
+    await compressor.compress(TRANSCRIPT, 200, TokenCounter(2.0))
+    assert compressor.chars_per_token == 4.0
+
+@pytest.mark.asyncio
+async def test_unmeasured_text_falls_back_to_the_estimate(compressor):
+    async def unavailable(text):
+        return None
+    assert await compressor.compress(TRANSCRIPT, 200, unavailable) == compressor.select(
+        compressor.sentences(TRANSCRIPT), int(200 * 4.0 * 0.95)
+    )
@@ -3,9 +3,15 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import hashlib
 import json
+import re
 import requests
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
 # Page configuration
 st.set_page_config(
@@ -68,35 +74,96 @@ st.markdown("""
 # API Configuration
 API_BASE_URL = "http://127.0.0.1:8000"
 API_KEY = "test_key"
+API_TIMEOUT = (10, 300)  # Connect, read (5 minutes)
+MAX_COMPARE_VIDEOS = 10
+MAX_CACHED_ANALYSES = 50
 
 
 # API Functions
+@st.cache_resource
+def get_http_session():
+    """Shared HTTP session so requests reuse pooled keep-alive connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_COMPARE_VIDEOS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json"
+    })
+    return session
+
+class AnalysisValidators:
+    """Last ETag and body for the most recently used videos, safe to share across threads"""
+
+    def __init__(self, max_entries=MAX_CACHED_ANALYSES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id):
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is not None:
+                self._entries.move_to_end(video_id)
+            return entry
+
+    def __setitem__(self, video_id, entry):
+        with self._lock:
+            self._entries[video_id] = entry
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+@st.cache_resource
+def get_analysis_validators():
+    """Last ETag and body per video, for conditional GETs of unchanged analyses"""
+    return AnalysisValidators()
+
+def request_video_analysis(video_url, session=None, validators=None):
+    """Fetch a video's analysis from the API; safe to call from worker threads.
+
+    Uses the cacheable GET resource with If-None-Match, so an analysis the
+    client already holds is revalidated without transferring it again.
+    Worker threads must be given the session and validators.
+    """
+    session = session or get_http_session()
+    video_id = extract_video_id(video_url)
+    if video_id:
+        validators = validators or get_analysis_validators()
+        cached = validators.get(video_id)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = session.get(f"{API_BASE_URL}/analysis/{video_id}", headers=headers, timeout=API_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+        if response.headers.get("ETag"):
+            validators[video_id] = (response.headers["ETag"], data)
+        return data
+    
+    payload = {
+        "video_url": video_url,
+        "include_comments": True,
+        "include_sentiment": True,
+        "include_topics": True,
+        "include_keywords": True
+    }
+    
+    response = session.post(
+        f"{API_BASE_URL}/analyze",
+        json=payload,
+        timeout=API_TIMEOUT
+    )
+    
+    response.raise_for_status()
+    return response.json()
+
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_video_analysis(video_url):
     """Fetch video analysis from API"""
     try:
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "video_url": video_url,
-            "include_comments": True,
-            "include_sentiment": True,
-            "include_topics": True,
-            "include_keywords": True
-        }
-        
-        response = requests.post(
-            f"{API_BASE_URL}/analyze",
-            json=payload,
-            headers=headers,
-            timeout=300  # 5 minute timeout
-        )
-        
-        response.raise_for_status()
-        return response.json()
+        return request_video_analysis(video_url)
         
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: {str(e)}")
@@ -184,6 +251,168 @@ def process_api_response(api_data):
         st.error(f"Error processing API response: {str(e)}")
         return None
 
+def extract_video_id(video_url):
+    """YouTube video id from a watch, short or embed URL"""
+    match = re.search(r'(?:v=|youtu\.be/|embed/)([\w-]{11})', video_url)
+    return match.group(1) if match else None
+
+def parse_view_count(views):
+    """Numeric view count from a formatted string like "454.1K views" """
+    views = str(views).replace(' views', '').replace(',', '')
+    if 'M' in views:
+        return float(views.split('M')[0]) * 1000000
+    if 'K' in views:
+        return float(views.split('K')[0]) * 1000
+    return float(views)
+
+def analysis_version(video_id, api_data):
+    """ETag the analysis body was served with, or a digest of the body if it has none"""
+    cached = get_analysis_validators().get(video_id)
+    if cached and cached[1] is api_data:
+        return cached[0]
+    return hashlib.sha256(json.dumps(api_data, sort_keys=True, default=str).encode()).hexdigest()
+
+@st.cache_data(ttl=3600)
+def processed_frames(video_id, version, _api_data):
+    """DataFrames for one analyzed video, cached by video id and analysis version across reruns"""
+    data = process_api_response(_api_data)
+    if not data:
+        return None
+    
+    video_data = data['video_data']
+    sentiment = {item['name']: item['value'] for item in data['sentiment_data']}
+    try:
+        views = parse_view_count(video_data['views'])
+        engagement_rate = ((video_data['likes'] + video_data['comments']) / views) * 100 if views > 0 else 0
+    except ValueError:
+        engagement_rate = 0
+    
+    summary = pd.DataFrame([{
+        "video_id": video_id,
+        "title": video_data['title'],
+        "channel": video_data['channel'],
+        "views": video_data['views'],
+        "likes": video_data['likes'],
+        "comments": video_data['comments'],
+        "engagement_rate": round(engagement_rate, 2),
+        "positive": sentiment.get('Positive', 0),
+        "neutral": sentiment.get('Neutral', 0),
+        "negative": sentiment.get('Negative', 0),
+        "avg_sentiment": _api_data.get('comment_analysis', {}).get('avg_sentiment', 0),
+        "keywords": ", ".join(data['keywords'][:5]),
+        "processing_time": video_data['processing_time']
+    }])
+    timeline = pd.DataFrame(data['sentiment_timeline'])
+    if not timeline.empty:
+        timeline['video'] = video_data['title'][:40]
+    topics = pd.DataFrame(data['topics_data'])
+    if not topics.empty:
+        topics['video'] = video_data['title'][:40]
+    
+    return {'summary': summary, 'timeline': timeline, 'topics': topics}
+
+def analyze_videos_concurrently(video_urls):
+    """Yield (video_url, api_data, error) as each concurrent analysis finishes"""
+    # Streamlit caches are only touched here, on the script thread
+    session = get_http_session()
+    validators = get_analysis_validators()
+    with ThreadPoolExecutor(max_workers=min(MAX_COMPARE_VIDEOS, len(video_urls))) as executor:
+        futures = {executor.submit(request_video_analysis, url, session, validators): url for url in video_urls}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, str(e)
+
+def render_compare_mode():
+    """Analyze several videos at once and compare them side by side"""
+    if 'compare_results' not in st.session_state:
+        st.session_state.compare_results = {}
+    
+    st.subheader("🆚 Compare Videos")
+    urls_text = st.text_area(
+        "Video URLs (one per line)",
+        placeholder="https://www.youtube.com/watch?v=...\nhttps://youtu.be/...",
+        help=f"Up to {MAX_COMPARE_VIDEOS} YouTube video URLs"
+    )
+    
+    video_urls = {}
+    for line in urls_text.splitlines():
+        video_id = extract_video_id(line.strip())
+        if video_id:
+            video_urls.setdefault(video_id, line.strip())
+    video_urls = dict(list(video_urls.items())[:MAX_COMPARE_VIDEOS])
+    
+    if st.button("🚀 Compare Videos", type="primary") and video_urls:
+        results = st.session_state.compare_results = {}
+        pending = {url: video_id for video_id, url in video_urls.items()}
+        progress_bar = st.progress(0)
+        arrivals = st.container()
+        
+        # Each video is shown as soon as its analysis arrives
+        for done, (url, api_data, error) in enumerate(analyze_videos_concurrently(list(pending)), start=1):
+            video_id = pending[url]
+            results[video_id] = api_data
+            with arrivals:
+                if error:
+                    st.error(f"{url}: {error}")
+                else:
+                    frames = processed_frames(video_id, analysis_version(video_id, api_data), api_data)
+                    if frames:
+                        row = frames['summary'].iloc[0]
+                        st.success(f"✅ {row['title']} — {row['positive']}% positive, "
+                                   f"{row['engagement_rate']:.2f}% engagement ({row['processing_time']:.1f}s)")
+            progress_bar.progress(done / len(pending))
+        progress_bar.empty()
+    
+    frames = [
+        processed_frames(video_id, analysis_version(video_id, api_data), api_data)
+        for video_id, api_data in st.session_state.compare_results.items() if api_data
+    ]
+    frames = [frame for frame in frames if frame]
+    if not frames:
+        st.info("👆 Enter two or more YouTube URLs above and click 'Compare Videos'.")
+        return
+    
+    summary_df = pd.concat([frame['summary'] for frame in frames], ignore_index=True)
+    
+    st.divider()
+    st.subheader("📋 Side-by-Side Summary")
+    st.dataframe(summary_df.drop(columns=['video_id']), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        sentiment_df = summary_df.melt(
+            id_vars=['title'], value_vars=['positive', 'neutral', 'negative'],
+            var_name='sentiment', value_name='percent'
+        )
+        fig_sentiment = px.bar(
+            sentiment_df, x='percent', y='title', color='sentiment', orientation='h',
+            title="Comment Sentiment by Video",
+            color_discrete_map={'positive': '#22c55e', 'neutral': '#64748b', 'negative': '#ef4444'}
+        )
+        st.plotly_chart(fig_sentiment, use_container_width=True)
+    with col2:
+        fig_engagement = px.bar(
+            summary_df, x='engagement_rate', y='title', orientation='h',
+            title="Engagement Rate (%)", color='engagement_rate', color_continuous_scale='Reds'
+        )
+        st.plotly_chart(fig_engagement, use_container_width=True)
+    
+    timelines = [frame['timeline'] for frame in frames if not frame['timeline'].empty]
+    if timelines:
+        timeline_df = pd.concat(timelines, ignore_index=True)
+        fig_timeline = px.line(
+            timeline_df, x='time', y='positive', color='video', markers=True,
+            title="Positive Sentiment Throughout Each Video"
+        )
+        st.plotly_chart(fig_timeline, use_container_width=True)
+    
+    topics = [frame['topics'] for frame in frames if not frame['topics'].empty]
+    if topics:
+        st.subheader("🎯 Topics Across Videos")
+        st.dataframe(pd.concat(topics, ignore_index=True), use_container_width=True, hide_index=True)
+
 def format_views(views):
     """Format view count for display"""
     # Since the API already returns formatted views, just return as is
@@ -229,6 +458,11 @@ if 'video_url' not in st.session_state:
 # Header
 st.markdown('<h1 class="main-header">🎬 InsightTube Video Analysis</h1>', unsafe_allow_html=True)
 
+mode = st.sidebar.radio("Mode", ["Single video", "Compare videos"])
+if mode == "Compare videos":
+    render_compare_mode()
+    st.stop()
+
 # Video URL Input
 st.subheader("🔗 Enter YouTube Video URL")
 video_url = st.text_input(
@@ -318,16 +552,8 @@ if st.session_state.analysis_data:
 
     with col4:
         # Calculate engagement rate
-        views_str = video_data.get('views', '0').replace('K', '000').replace('M', '000000').replace(' views', '').replace(',', '')
         try:
-            # Extract numeric value from formatted string like "454.1K views"
-            if 'K' in video_data.get('views', ''):
-                views_num = float(video_data['views'].split('K')[0]) * 1000
-            elif 'M' in video_data.get('views', ''):
-                views_num = float(video_data['views'].split('M')[0]) * 1000000
-            else:
-                views_num = float(views_str)
-            
+            views_num = parse_view_count(video_data.get('views', '0'))
             engagement_rate = ((video_data['likes'] + video_data['comments']) / views_num) * 100 if views_num > 0 else 0
             st.metric("📈 Engagement", f"{engagement_rate:.2f}%")
         except: